@@ -0,0 +1,144 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_question(question: str) -> str:
+    """Normalize question text so trivially different renderings share a cache entry"""
+    return re.sub(r"\s+", " ", question).strip().lower()
+
+
+class AnswerCache:
+    """Persistent SQLite-backed answer cache with LRU eviction and optional TTL"""
+
+    def __init__(self, path: str = "answer-cache.sqlite3", max_entries: int = 5000, ttl_seconds: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(question: str, model: str) -> str:
+        """Build the cache key from the normalized question and model name"""
+        return hashlib.sha256(f"{model}\0{normalize_question(question)}".encode("utf-8")).hexdigest()
+
+    def get(self, question: str, model: str) -> Optional[str]:
+        """Return the cached answer, or None on a miss or expired entry"""
+        key = self.make_key(question, model)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, created_at FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if not row:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, question: str, model: str, answer: str):
+        """Store an answer and evict the least recently used entries beyond max_entries"""
+        key = self.make_key(question, model)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute('''
+                INSERT INTO answers (key, model, question, answer, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    answer = excluded.answer,
+                    created_at = excluded.created_at,
+                    last_used = excluded.last_used
+            ''', (key, model, question, answer, now, now))
+
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> int:
+        """Delete least recently used entries beyond max_entries; call with the lock held"""
+        count = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        if count <= self.max_entries:
+            return 0
+        self._conn.execute('''
+            DELETE FROM answers WHERE key IN (
+                SELECT key FROM answers ORDER BY last_used ASC LIMIT ?
+            )
+        ''', (count - self.max_entries,))
+        return count - self.max_entries
+
+    def prune(self) -> int:
+        """Delete expired entries and enforce max_entries. Returns the number of entries removed."""
+        with self._lock:
+            removed = 0
+            if self.ttl_seconds is not None:
+                removed += self._conn.execute(
+                    "DELETE FROM answers WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+            removed += self._evict()
+            self._conn.commit()
+            return removed
+
+    def clear(self) -> int:
+        """Delete every entry. Returns the number of entries removed."""
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM answers").rowcount
+            self._conn.commit()
+            return removed
+
+    def model_counts(self) -> Dict[str, int]:
+        """Number of stored answers per model"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT model, COUNT(*) FROM answers GROUP BY model").fetchall())
+
+    def entries(self, model: str) -> List[Tuple[str, str]]:
+        """All unexpired (question, answer) pairs stored for model, most recently used last"""
+        query = "SELECT question, answer FROM answers WHERE model = ?"
+        params: tuple = (model,)
+        if self.ttl_seconds is not None:
+            query += " AND created_at >= ?"
+            params += (time.time() - self.ttl_seconds,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY last_used ASC", params).fetchall()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def print_stats(self):
+        """Print hit/miss counters for this run"""
+        lookups = self.hits + self.misses
+        hit_rate = (self.hits / lookups * 100) if lookups else 0.0
+        print(f"Answer cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate), {len(self)} entries stored")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,107 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from answer_cache import normalize_question
+from llm_client import LLMError
+
+
+class AnswerPipeline:
+    """Prefetches answers on a bounded worker pool so LLM latency overlaps browser work.
+    
+    With a batch_fn, questions prefetched together are sent in batches of batch_size. The deck a
+    question was submitted for is passed on to answer_fn and batch_fn, since workers may still be
+    answering it after the caller has moved on to the next deck.
+    """
+
+    def __init__(
+        self,
+        answer_fn: Callable[[str, Optional[str]], str],
+        max_workers: int = 4,
+        batch_fn: Optional[Callable[[List[str], Optional[str]], Dict[str, str]]] = None,
+        batch_size: int = 1
+    ):
+        self.answer_fn = answer_fn
+        self.max_workers = max_workers
+        self.batch_fn = batch_fn
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="answer-worker")
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, question: str, deck: Optional[str] = None) -> Future:
+        """Start answering a question in the background, reusing an in-flight request for the same question"""
+        key = normalize_question(question)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._executor.submit(self.answer_fn, question, deck)
+                self._futures[key] = future
+            return future
+
+    def prefetch(self, questions: Iterable[str], deck: Optional[str] = None) -> int:
+        """Submit several questions at once; at most max_workers requests run concurrently"""
+        new_questions = []
+        with self._lock:
+            for question in questions:
+                key = normalize_question(question) if question else None
+                if key and key not in self._futures and question not in new_questions:
+                    new_questions.append(question)
+
+        if not self.batch_fn or self.batch_size <= 1 or len(new_questions) < 2:
+            for question in new_questions:
+                self.submit(question, deck)
+            return len(new_questions)
+
+        for start in range(0, len(new_questions), self.batch_size):
+            chunk = new_questions[start:start + self.batch_size]
+            futures = {}
+            with self._lock:
+                for question in chunk:
+                    key = normalize_question(question)
+                    if key not in self._futures:
+                        futures[question] = self._futures[key] = Future()
+            if futures:
+                self._executor.submit(self._run_batch, futures, deck)
+        return len(new_questions)
+
+    def _run_batch(self, futures: Dict[str, Future], deck: Optional[str]):
+        # Questions whose futures were cancelled by shutdown() are not asked; the rest can no longer be cancelled
+        futures = {question: future for question, future in futures.items() if future.set_running_or_notify_cancel()}
+        if not futures:
+            return
+        try:
+            answers = self.batch_fn(list(futures), deck)
+        except Exception as e:
+            print(f"Error answering batch: {str(e)}")
+            answers = {}
+
+        for question, future in futures.items():
+            answer = answers.get(question)
+            if answer is not None:
+                future.set_result(answer)
+            else:
+                future.set_exception(LLMError("question was not answered in its batch"))
+
+    def pending(self, question: str) -> bool:
+        """Whether an answer for question is already in flight or waiting to be collected"""
+        with self._lock:
+            return normalize_question(question) in self._futures
+
+    def result(self, question: str, deck: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        """Block until the answer for question is ready, submitting it first if needed"""
+        key = normalize_question(question)
+        future = self.submit(question, deck)
+        try:
+            return future.result(timeout)
+        finally:
+            with self._lock:
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        # Batch futures are not executor tasks, so cancel_futures does not reach them
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
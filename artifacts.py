@@ -0,0 +1,148 @@
+import base64
+import gzip
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+def error_signature(name: str, error: Optional[BaseException] = None) -> str:
+    """Group failures that only differ in numbers, ids or the WebDriver stacktrace"""
+    if error is None:
+        return name
+    message = (str(error).strip().splitlines() or [""])[0]
+    message = re.sub(r"0x[0-9a-f]+|\d+", "#", message.lower())[:120]
+    return f"{name}:{type(error).__name__}:{message}"
+
+
+class ArtifactWriter:
+    """Captures error artifacts (screenshot, gzipped page source and recent DOM snapshots).
+
+    The screenshot and page source are read from the browser in capture() itself, so they show
+    the page at the moment of failure and no WebDriver command runs concurrently with the main
+    thread. Decoding, compression and disk writes happen on a background thread, so error paths
+    don't block on them.
+
+    Captures are deduplicated by error signature (at most max_per_signature per run) and
+    rate-limited to one every min_interval seconds. The last snapshot_count card snapshots are
+    kept in memory and only written out alongside a capture. driver may be set after construction.
+    """
+
+    def __init__(
+        self,
+        directory: str = "artifacts",
+        min_interval: float = 5.0,
+        max_per_signature: int = 3,
+        snapshot_count: int = 20,
+        driver=None
+    ):
+        self.driver = driver
+        self.directory = directory
+        self.min_interval = min_interval
+        self.max_per_signature = max_per_signature
+        self.captured = 0
+        self.suppressed: Dict[str, int] = {}
+        self._signatures: Dict[str, int] = {}
+        self._last_capture = 0.0
+        self._sequence = 0
+        self._snapshots: deque = deque(maxlen=snapshot_count)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def snapshot(self, state: Dict):
+        """Remember a card state (card HTML plus stats text) without touching the disk"""
+        self._snapshots.append({
+            "at": time.time(),
+            "question": state.get("question"),
+            "stats": state.get("statsText"),
+            "html": state.get("cardHtml")
+        })
+
+    def capture(self, name: str, error: Optional[BaseException] = None) -> bool:
+        """Queue a capture for this failure. Returns False when it was deduplicated or rate-limited."""
+        signature = error_signature(name, error)
+        now = time.monotonic()
+        with self._lock:
+            seen = self._signatures.get(signature, 0)
+            if seen >= self.max_per_signature or now - self._last_capture < self.min_interval:
+                self.suppressed[signature] = self.suppressed.get(signature, 0) + 1
+                return False
+            self._signatures[signature] = seen + 1
+            self._last_capture = now
+            self._sequence += 1
+            sequence = self._sequence
+            snapshots = list(self._snapshots)
+            self._snapshots.clear()
+
+        screenshot = page_source = None
+        if self.driver is not None:
+            try:
+                screenshot = self.driver.get_screenshot_as_base64()
+            except Exception as e:
+                print(f"Could not take screenshot for {name}: {str(e)}")
+            try:
+                page_source = self.driver.page_source
+            except Exception as e:
+                print(f"Could not read page source for {name}: {str(e)}")
+
+        self._queue.put({
+            "name": name,
+            "sequence": sequence,
+            "signature": signature,
+            "error": f"{type(error).__name__}: {error}" if error else None,
+            "at": time.time(),
+            "snapshots": snapshots,
+            "screenshot": screenshot,
+            "page_source": page_source
+        })
+        return True
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._write(job)
+            except Exception as e:
+                print(f"Error writing artifacts for {job['name']}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, job: Dict):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(job["at"]))
+        base = os.path.join(self.directory, f"{stamp}-{job['sequence']:03d}-{job['name']}")
+
+        if job["screenshot"]:
+            with open(f"{base}.png", "wb") as f:
+                f.write(base64.b64decode(job["screenshot"]))
+        if job["page_source"] is not None:
+            with gzip.open(f"{base}.html.gz", "wt", encoding="utf-8") as f:
+                f.write(job["page_source"])
+
+        with gzip.open(f"{base}.json.gz", "wt", encoding="utf-8") as f:
+            json.dump({
+                "name": job["name"],
+                "signature": job["signature"],
+                "error": job["error"],
+                "at": job["at"],
+                "snapshots": job["snapshots"]
+            }, f, indent=2)
+        self.captured += 1
+
+    def print_stats(self):
+        suppressed = sum(self.suppressed.values())
+        if self.captured or suppressed:
+            print(f"Error artifacts: {self.captured} captured in {self.directory}/, {suppressed} repeats suppressed")
+
+    def close(self, timeout: float = 10):
+        """Finish pending captures and stop the writer"""
+        self._queue.put(None)
+        self._thread.join(timeout)
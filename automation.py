@@ -0,0 +1,1414 @@
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException, WebDriverException
+from selenium.webdriver.common.action_chains import ActionChains
+import time
+import requests
+import json
+import functools
+from urllib.parse import urlparse
+from itertools import groupby
+from contextlib import nullcontext
+from typing import List, Dict, Optional, Tuple
+from answer_cache import AnswerCache
+from artifacts import ArtifactWriter
+from browser import BrowserManager
+from click_strategies import ClickStrategyCache
+from answer_pipeline import AnswerPipeline
+from fuzzy_index import FuzzyQuestionIndex
+from http_crawler import HttpCrawler, HttpCrawlError
+from curriculum_index import CurriculumIndex
+from deck_scheduler import DeckScheduler
+from run_ledger import RunLedger
+from metrics import Metrics
+from profiler import WebDriverProfiler
+from memory_watchdog import MemoryWatchdog
+from run_trace import TraceRecorder
+from llm_client import LLMClient, LLMError, apply_answer_budget
+from progress_tracker import ProgressTracker, parse_progress
+
+CLAUDE_MODEL = "claude-3-5-haiku-20241022"
+
+# How long the page helper waits for the "I knew it" button after flipping a card
+KNEW_IT_TIMEOUT_MS = 8000
+
+# Upper bound for any execute_async_script call, so WebDriver never gives up before our own timeouts do
+SCRIPT_TIMEOUT_SECONDS = 20
+
+STATS_MESSAGE_SELECTOR = "#flashcards-container > div > div:nth-child(2) > div > div > div.deck-stats-message > div"
+FLIP_BUTTON_SELECTOR = "#flashcard > div > div.flashcard-game-card-front > div > div.flashcard-game-card-content > button"
+KNEW_IT_BUTTON_SELECTOR = "#played-card-submit-know"
+
+# Per-condition timeouts in seconds for wait_for()
+WAIT_TIMEOUTS = {
+    "document_ready": 10,
+    "page_replaced": 10,
+    "deck_ready": 10,
+    "card_changed": 6,
+    "stats_changed": 3,
+}
+
+# Installed once per page as window.__flashcardooor. state() reads everything handle_flashcard
+# needs in one call; answer() fills, flips and clicks "I knew it" in one async call that
+# resolves as soon as the button becomes visible.
+CARD_HELPER_JS = '''
+(() => {
+    if (window.__flashcardooor) return;
+    
+    const CARD_CONTENT = ".flashcard-game-card-content";
+    const QUESTION = ".flashcard-game-card-content-markdown p";
+    const FLIP_BUTTON = "__FLIP_BUTTON_SELECTOR__";
+    const KNEW_IT_BUTTON = "__KNEW_IT_BUTTON_SELECTOR__";
+    const TEXTAREA = "#user-guess-text-area";
+    const STATS_MESSAGE = "__STATS_MESSAGE_SELECTOR__";
+    
+    const isVisible = (element) => Boolean(element &&
+        window.getComputedStyle(element).display !== 'none' &&
+        window.getComputedStyle(element).visibility !== 'hidden');
+    
+    // Resolve with check()'s result as soon as it is truthy, re-checking on every DOM
+    // mutation (plus a slow poll for style-only changes), or with null on timeout
+    const waitFor = (check, timeoutMs) => new Promise((resolve) => {
+        const initial = check();
+        if (initial) return resolve(initial);
+        
+        let finished = false;
+        const finish = (result) => {
+            if (finished) return;
+            finished = true;
+            observer.disconnect();
+            clearInterval(poll);
+            clearTimeout(timer);
+            resolve(result);
+        };
+        const recheck = () => {
+            const result = check();
+            if (result) finish(result);
+        };
+        const observer = new MutationObserver(recheck);
+        observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+        const poll = setInterval(recheck, 100);
+        const timer = setTimeout(() => finish(check() || null), timeoutMs);
+    });
+    
+    const visibleKnewIt = () => {
+        const button = document.querySelector(KNEW_IT_BUTTON);
+        return isVisible(button) ? button : null;
+    };
+    
+    // Bump cardVersion whenever the question node is replaced or its text changes, so
+    // callers can wait for "the next card" even when two cards share the same text
+    let cardVersion = 0;
+    let lastQuestionNode = null;
+    let lastQuestionText = null;
+    const trackCard = () => {
+        const node = document.querySelector(QUESTION);
+        const text = node ? node.textContent : null;
+        if (node !== lastQuestionNode || text !== lastQuestionText) {
+            lastQuestionNode = node;
+            lastQuestionText = text;
+            cardVersion++;
+        }
+    };
+    trackCard();
+    new MutationObserver(trackCard).observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    
+    window.__flashcardooor = {
+        waitFor: waitFor,
+        
+        cardVersion() {
+            return cardVersion;
+        },
+        
+        // Every distinct question rendered in the deck, for prefetching answers
+        questions() {
+            const texts = Array.from(document.querySelectorAll(QUESTION)).map((node) => node.textContent);
+            return Array.from(new Set(texts.filter(Boolean)));
+        },
+        
+        state() {
+            const question = document.querySelector(QUESTION);
+            const stats = document.querySelector(STATS_MESSAGE);
+            const card = document.querySelector(CARD_CONTENT);
+            return {
+                present: Boolean(card),
+                flipped: Boolean(visibleKnewIt()),
+                question: question ? question.textContent : null,
+                flipVisible: isVisible(document.querySelector(FLIP_BUTTON)),
+                cardVersion: cardVersion,
+                statsText: stats ? stats.textContent.trim() : null,
+                // Kept in the error snapshot ring buffer
+                cardHtml: card ? card.outerHTML.slice(0, 20000) : null
+            };
+        },
+        
+        // Resolves with in-page timings (ms) so the caller can attribute time to each phase
+        clickKnewIt(timeoutMs, done, timings = {}) {
+            const waitStarted = performance.now();
+            waitFor(visibleKnewIt, timeoutMs).then((button) => {
+                if (!button) return done({ok: false, error: "'I knew it' button never became visible"});
+                const visible = performance.now();
+                button.click();
+                timings.flip = visible - waitStarted;
+                timings.knewItClick = performance.now() - visible;
+                done({ok: true, timings: timings});
+            });
+        },
+        
+        // Write (partial) answer text without flipping, used while an answer streams in
+        fill(text) {
+            const textarea = document.querySelector(TEXTAREA);
+            if (!textarea) return false;
+            textarea.value = text;
+            textarea.dispatchEvent(new Event('input', {bubbles: true}));
+            return true;
+        },
+        
+        answer(text, timeoutMs, done) {
+            const started = performance.now();
+            if (!this.fill(text)) return done({ok: false, error: "answer textarea not found"});
+            const timings = {answerEntry: performance.now() - started};
+            
+            const flipButton = document.querySelector(FLIP_BUTTON);
+            if (!flipButton) return done({ok: false, error: "flip button not found"});
+            flipButton.click();
+            
+            this.clickKnewIt(timeoutMs, done, timings);
+        }
+    };
+})();
+'''.replace("__STATS_MESSAGE_SELECTOR__", STATS_MESSAGE_SELECTOR).replace(
+    "__FLIP_BUTTON_SELECTOR__", FLIP_BUTTON_SELECTOR
+).replace("__KNEW_IT_BUTTON_SELECTOR__", KNEW_IT_BUTTON_SELECTOR)
+
+# Generic condition wait used by wait_for(). Arguments: condition name, condition argument,
+# timeout in ms. Re-checks on every DOM mutation plus a 100 ms poll, and resolves with
+# whether the condition was met before the timeout.
+WAIT_CONDITION_JS = '''
+const [name, arg, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const STATS_MESSAGE = "__STATS_MESSAGE_SELECTOR__";
+
+const statsText = () => {
+    const stats = document.querySelector(STATS_MESSAGE);
+    return stats ? stats.textContent.trim() : null;
+};
+const isFresh = () => Boolean(document.body) && !document.body.dataset.flashcardooorStale;
+
+const conditions = {
+    // The document has finished loading
+    document_ready: () => document.readyState === 'complete',
+    // The body marked stale before a click-triggered navigation has been replaced
+    page_replaced: () => isFresh() && document.readyState === 'complete',
+    // A fresh deck page with its stats message rendered
+    deck_ready: () => isFresh() && Boolean(statsText()),
+    // The card helper saw a new card, the deck was completed, or the page moved on
+    card_changed: () => !window.__flashcardooor ||
+        window.__flashcardooor.cardVersion() > arg ||
+        (statsText() || '').includes('have mastered all'),
+    // The deck stats message differs from the text we last read
+    stats_changed: () => statsText() !== null && statsText() !== arg
+};
+
+const check = conditions[name];
+if (!check) throw new Error(`Unknown wait condition: ${name}`);
+if (check()) return done(true);
+
+let finished = false;
+const finish = (met) => {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearInterval(poll);
+    clearTimeout(timer);
+    done(met);
+};
+const recheck = () => {
+    try {
+        if (check()) finish(true);
+    } catch (e) {
+        // The DOM is mid-transition; try again on the next mutation or poll
+    }
+};
+const observer = new MutationObserver(recheck);
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+const poll = setInterval(recheck, 100);
+const timer = setTimeout(() => finish(false), timeoutMs);
+'''.replace("__STATS_MESSAGE_SELECTOR__", STATS_MESSAGE_SELECTOR)
+
+
+class WaitReport:
+    """Accumulates time spent in event-driven waits against the fixed sleeps they replaced"""
+
+    def __init__(self):
+        self.totals: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, waited: float, baseline: float, met: bool):
+        totals = self.totals.setdefault(name, {"count": 0, "waited": 0.0, "baseline": 0.0, "timeouts": 0})
+        totals["count"] += 1
+        totals["waited"] += waited
+        totals["baseline"] += baseline
+        if not met:
+            totals["timeouts"] += 1
+
+    def print_report(self):
+        """Print total waiting time versus the sleep-based baseline"""
+        if not self.totals:
+            return
+        waited = sum(t["waited"] for t in self.totals.values())
+        baseline = sum(t["baseline"] for t in self.totals.values())
+        print(f"Waiting: {waited:.1f}s in event-driven waits vs {baseline:.1f}s of fixed sleeps "
+              f"(saved {baseline - waited:.1f}s)")
+        for name, t in sorted(self.totals.items(), key=lambda item: -item[1]["waited"]):
+            print(f"- {name}: {t['count']} waits, {t['waited']:.1f}s waited vs {t['baseline']:.1f}s baseline, "
+                  f"{t['timeouts']} timeouts")
+
+
+class RoundTripCounter:
+    """Stands in for the driver's command executor, counting every WebDriver command it sends
+    (scripts, waits' polls, clicks, navigation) through on_command"""
+    
+    def __init__(self, executor, on_command):
+        self._executor = executor
+        self._on_command = on_command
+    
+    def execute(self, command: str, params: Dict) -> Dict:
+        self._on_command()
+        return self._executor.execute(command, params)
+    
+    def __getattr__(self, name):
+        return getattr(self._executor, name)
+
+
+def css_string(value: str) -> str:
+    """Quote value as a CSS string, so an attribute selector stays valid whatever the value holds"""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\a ")
+    return f'"{escaped}"'
+
+
+def timed(phase: str):
+    """Record every call of a FlashcardAutomation method as a metrics span named after its phase"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.span(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class FlashcardAutomation:
+    def __init__(
+        self,
+        claude_api_key: str,
+        answer_cache: Optional[AnswerCache] = None,
+        fuzzy_index: Optional[FuzzyQuestionIndex] = None,
+        prefetch_workers: int = 4,
+        batch_size: int = 8,
+        curriculum_index: Optional[CurriculumIndex] = None,
+        run_ledger: Optional[RunLedger] = None,
+        driver: Optional[webdriver.Remote] = None,
+        llm_client: Optional[LLMClient] = None,
+        metrics: Optional[Metrics] = None,
+        stream_answers: bool = False,
+        answer_max_chars: Optional[int] = None,
+        answer_max_sentences: Optional[int] = None,
+        stream_update_interval: Optional[float] = 0.5,
+        progress_verify_every: int = 10,
+        artifacts: Optional[ArtifactWriter] = None,
+        browser: Optional[BrowserManager] = None,
+        http_crawler: Optional[HttpCrawler] = None,
+        click_strategies: Optional[ClickStrategyCache] = None,
+        memory_watchdog: Optional[MemoryWatchdog] = None,
+        trace: Optional[TraceRecorder] = None,
+        scheduler: Optional[DeckScheduler] = None,
+        profiler: Optional[WebDriverProfiler] = None
+    ):
+        self.trace = trace
+        self.profiler = profiler
+        self.artifacts = artifacts or ArtifactWriter()
+        if driver is None:
+            browser = browser or BrowserManager()
+            driver = browser.start()
+        self.browser = browser
+        self.round_trips = 0
+        self.card_round_trips: List[int] = []
+        self._use_driver(driver)
+        self.llm_client = llm_client or LLMClient(api_key=claude_api_key, model=CLAUDE_MODEL)
+        if trace:
+            trace.attach_llm(self.llm_client)
+            if http_crawler:
+                trace.attach_http(http_crawler)
+        self.answer_cache = answer_cache
+        self.fuzzy_index = fuzzy_index
+        self.wait_report = WaitReport()
+        self.last_card_state: Optional[Dict] = None
+        self.answer_pipeline = AnswerPipeline(
+            self.get_claude_response,
+            max_workers=prefetch_workers,
+            batch_fn=self.get_claude_responses,
+            batch_size=batch_size
+        )
+        self.deck_questions: Dict[str, List[str]] = {}
+        self.cards_completed = 0
+        self.card_seconds = 0.0
+        self.curriculum_index = curriculum_index or CurriculumIndex(path=None)
+        self.homepage_url: Optional[str] = None
+        self.run_ledger = run_ledger
+        self.metrics = metrics or Metrics()
+        self.stream_answers = stream_answers
+        self.answer_max_chars = answer_max_chars
+        self.answer_max_sentences = answer_max_sentences
+        self.stream_update_interval = stream_update_interval
+        self.progress_verify_every = progress_verify_every
+        self.http_crawler = http_crawler
+        self.click_strategies = click_strategies or ClickStrategyCache(path=None)
+        self.memory_watchdog = memory_watchdog
+        self.scheduler = scheduler or DeckScheduler()
+        
+    def _use_driver(self, driver: webdriver.Remote):
+        # Innermost, so the trace and profiler wrappers see the calling frames they expect
+        driver.command_executor = RoundTripCounter(driver.command_executor, self._count_round_trip)
+        if self.trace:
+            self.trace.attach_driver(driver)
+        if self.profiler:
+            self.profiler.attach_driver(driver)
+        self.driver = driver
+        self.driver.set_script_timeout(SCRIPT_TIMEOUT_SECONDS)
+        self.wait = WebDriverWait(self.driver, 10)
+        self.artifacts.driver = driver
+    
+    def _count_round_trip(self):
+        self.round_trips += 1
+    
+    def sleep(self, seconds: float):
+        """Fixed pause, recorded in the trace (and skipped when replaying one)"""
+        if self.trace:
+            self.trace.sleep(seconds)
+        else:
+            time.sleep(seconds)
+    
+    def ensure_browser(self) -> bool:
+        """Health-check the browser and relaunch it if it died. Returns True after a relaunch."""
+        if not self.browser or self.browser.is_alive(self.driver):
+            return False
+        print("Browser is not responding - relaunching...")
+        self._use_driver(self.browser.relaunch(self.driver))
+        self.metrics.increment("browser_relaunches")
+        if self.homepage_url:
+            self.driver.get(self.homepage_url)
+            self.wait_for("document_ready", baseline=3)
+            if not self.is_logged_in():
+                print("WARNING: the relaunched browser is not logged in - use CHROME_USER_DATA_DIR to keep the session")
+        return True
+    
+    def check_memory(self):
+        """At a deck boundary, recycle the tab or the whole browser if the watchdog says memory has grown too much"""
+        if not self.memory_watchdog:
+            return
+        attached = bool(self.browser and self.browser.attached)
+        action = self.memory_watchdog.check(self.driver, attached)
+        if action == "browser" and self.browser and not attached:
+            self.recycle_browser()
+        elif action:
+            self.recycle_tab()
+    
+    def recycle_tab(self):
+        """Swap the current tab for a fresh one; the session cookies belong to the browser and stay"""
+        print("Recycling the browser tab to release page memory...")
+        old_handle = self.driver.current_window_handle
+        self.driver.switch_to.new_window('tab')
+        new_handle = self.driver.current_window_handle
+        self.driver.switch_to.window(old_handle)
+        self.driver.close()
+        self.driver.switch_to.window(new_handle)
+        self.memory_watchdog.tab_recycles += 1
+        self.metrics.increment("tab_recycles")
+    
+    def recycle_browser(self):
+        """Restart Chrome, carrying the session cookies over so the run continues logged in"""
+        print("Restarting the browser to release memory...")
+        cookies = self.driver.get_cookies()
+        self._use_driver(self.browser.relaunch(self.driver))
+        if self.homepage_url:
+            # Cookies can only be set for the domain that is currently loaded
+            self.driver.get(self.homepage_url)
+            for cookie in cookies:
+                try:
+                    self.driver.add_cookie({
+                        key: cookie[key] for key in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry")
+                        if key in cookie
+                    })
+                except WebDriverException as e:
+                    print(f"Could not restore cookie {cookie.get('name')}: {str(e)}")
+        self.memory_watchdog.browser_recycles += 1
+        self.metrics.increment("browser_recycles")
+    
+    def deck_scope(self, url: str):
+        """Attribute trace events to the deck being processed"""
+        return self.trace.deck_scope(url) if self.trace else nullcontext()
+    
+    def is_logged_in(self) -> bool:
+        """Whether the homepage loaded without being redirected to a login or OAuth screen"""
+        try:
+            return self._execute_script('''
+                const [homepagePath] = arguments;
+                if (document.querySelector("input[type=password]")) return false;
+                if (/sign_in|sign-in|login|oauth|github\\.com/i.test(location.href)) return false;
+                return !homepagePath || location.pathname === homepagePath;
+            ''', urlparse(self.homepage_url).path if self.homepage_url else None)
+        except WebDriverException:
+            return False
+    
+    def wait_for(self, condition: str, arg=None, baseline: float = 0.0) -> bool:
+        """Wait until an in-page condition holds, instead of sleeping a fixed time.
+        
+        baseline is the fixed sleep this wait replaces; it is used for the waiting report and
+        as a fallback sleep if the condition cannot be evaluated at all.
+        """
+        timeout = WAIT_TIMEOUTS[condition]
+        start = time.monotonic()
+        met = False
+        with self.metrics.span(f"wait_{condition}"):
+            try:
+                while True:
+                    remaining = timeout - (time.monotonic() - start)
+                    try:
+                        met = bool(self._execute_async_script(
+                            WAIT_CONDITION_JS, condition, arg, int(max(remaining, 0) * 1000)
+                        ))
+                        break
+                    except WebDriverException as e:
+                        # A navigation unloaded the page mid-wait; re-check on the new document
+                        if "unloaded" not in str(e) or remaining <= 0:
+                            raise
+                
+                if not met:
+                    print(f"Timed out after {timeout}s waiting for {condition}")
+            except Exception as e:
+                print(f"Could not wait for {condition} ({str(e)}), falling back to a {baseline}s sleep")
+                self.sleep(baseline)
+            finally:
+                self.wait_report.record(condition, time.monotonic() - start, baseline, met)
+            
+        return met
+        
+    def wait_and_click(self, selector: str, by: By = By.CSS_SELECTOR, timeout: float = 10,
+                       key: Optional[str] = None, navigates: bool = False, clickable: bool = False) -> bool:
+        """Wait for an element and click it, trying the strategy that last worked first.
+        
+        Strategies are learned per key (default: the selector), so elements of one kind with
+        different selectors, like module links, share what was learned. With navigates, the
+        page is marked stale first so wait_for("page_replaced") can follow the click. With
+        clickable, waits for the element to be visible and enabled rather than just present.
+        """
+        key = key or selector
+        try:
+            print(f"Attempting to find element: {selector}")
+            element = WebDriverWait(self.driver, timeout).until(
+                (EC.element_to_be_clickable if clickable else EC.presence_of_element_located)((by, selector))
+            )
+            
+            # An instant scroll has finished by the time the script returns, so there is nothing to wait for
+            self._execute_script(
+                "arguments[0].scrollIntoView({block: 'center'}); "
+                "if (arguments[1]) document.body.dataset.flashcardooorStale = '1';",
+                element, navigates
+            )
+            
+            for attempt, strategy in enumerate(self.click_strategies.order(key)):
+                try:
+                    print(f"Attempting {strategy} click...")
+                    succeeded = self._click(strategy, element)
+                except Exception as e:
+                    print(f"{strategy.capitalize()} click failed: {str(e)}")
+                    succeeded = False
+                self.click_strategies.record(key, strategy, succeeded, attempt)
+                if succeeded:
+                    return True
+            
+            return False
+            
+        except Exception as e:
+            print(f"Error finding/clicking element '{selector}': {str(e)}")
+            return False
+
+    def _click(self, strategy: str, element) -> bool:
+        if strategy == "standard":
+            element.click()
+        elif strategy == "javascript":
+            self._execute_script("arguments[0].click();", element)
+        elif strategy == "actions":
+            ActionChains(self.driver).move_to_element(element).click().perform()
+        else:
+            href = element.get_attribute('href')
+            if not href:
+                return False
+            self.driver.get(href)
+        return True
+
+    @timed("progress_parsing")
+    def get_flashcard_progress(self) -> tuple[int, int]:
+        """Get current progress with comprehensive message detection including completion"""
+        try:
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#flashcards-container"))
+            )
+            
+            stats_text = self._execute_script(
+                "const stats = document.querySelector(arguments[0]); return stats ? stats.textContent.trim() : null;",
+                STATS_MESSAGE_SELECTOR
+            )
+            progress = parse_progress(stats_text)
+            
+            if not progress:
+                print("Could not parse flashcard progress message")
+                return (0, 0)
+            
+            completed, total = progress
+            if completed == total:
+                print(f"✨ All {total} cards mastered! ✨")
+            else:
+                print(f"Progress: {completed}/{total} cards completed")
+                print(f"Remaining: {total - completed} cards to master")
+            
+            return progress
+            
+        except Exception as e:
+            print(f"Error getting flashcard progress: {str(e)}")
+            self.artifacts.capture("progress-error", e)
+            return (0, 0)
+
+    def _record_checkpoint(self, deck_url: str, event: str, completed: int = 0, total: int = 0,
+                           outcome: Optional[str] = None):
+        """Append a checkpoint to the run ledger, if one is configured"""
+        if self.run_ledger:
+            self.run_ledger.record(deck_url, event, completed, total, outcome)
+
+    def process_flashcards_section(self, deck_url: str) -> Optional[tuple[int, int]]:
+        """Open a deck by URL and process its flashcards with improved completion detection.
+        
+        Returns the final (completed, total) progress, or None if the deck could not be processed.
+        """
+        try:
+            print("\nProcessing flashcard section...")
+            
+            with self.metrics.span("deck_navigation"):
+                print(f"Opening deck: {deck_url}")
+                self.driver.get(deck_url)
+                self.wait_for("deck_ready", baseline=3)
+            
+            completed, total = self.get_flashcard_progress()
+            self._record_checkpoint(deck_url, "start", completed, total)
+            
+            if total == 0:
+                print("Could not determine total flashcards")
+                self._record_checkpoint(deck_url, "finish", outcome="failed")
+                return None
+                
+            if completed == total:
+                print(f"✨ Section complete! All {total} cards mastered ✨")
+                self._record_checkpoint(deck_url, "finish", completed, total, outcome="complete")
+                return (completed, total)
+                
+            remaining = total - completed
+            print(f"\nProcessing {remaining} remaining flashcards")
+            
+            self.prefetch_deck_answers(deck_url)
+            
+            tracker = ProgressTracker(completed, total, verify_every=self.progress_verify_every)
+            cards_processed = 0
+            consecutive_errors = 0
+            max_errors = 3
+            section_start = time.monotonic()
+            
+            while cards_processed < remaining:
+                if self.scheduler.expired():
+                    print("\nTime budget used up - leaving the deck")
+                    break
+                with self.metrics.span("card"):
+                    round_trips_before = self.round_trips
+                
+                    try:
+                        state = self.get_card_state()
+                    except WebDriverException as e:
+                        print(f"Could not read card state ahead of time: {str(e)}")
+                        state = None
+                    
+                    if state:
+                        # The stats message comes with the card state, so a change costs no extra round-trip
+                        tracker.observe(state['statsText'])
+                    
+                    if state and state['question'] and not state['flipped']:
+                        if not self.stream_answers:
+                            # Start the LLM call now so it overlaps the progress check below
+                            self.answer_pipeline.submit(state['question'], deck_url)
+                        seen = self.deck_questions.setdefault(deck_url, [])
+                        if state['question'] not in seen:
+                            seen.append(state['question'])
+                
+                    if tracker.needs_verification():
+                        tracker.verified(*self.get_flashcard_progress())
+                        self.metrics.increment("progress_verifications")
+                    if tracker.is_complete:
+                        print(f"✨ All cards completed! ✨")
+                        break
+                    
+                    success = self.handle_flashcard(state, deck_url)
+                    self.card_round_trips.append(self.round_trips - round_trips_before)
+                    if success:
+                        cards_processed += 1
+                        consecutive_errors = 0
+                        tracker.advance()
+                        print(f"\nProgress: {cards_processed}/{remaining} remaining cards completed")
+                        print(f"Overall: {tracker.completed}/{tracker.total}")
+                        self._record_checkpoint(deck_url, "card", tracker.completed, tracker.total)
+                    else:
+                        consecutive_errors += 1
+                        if consecutive_errors >= max_errors:
+                            print(f"\nToo many consecutive errors ({max_errors}) - stopping")
+                            break
+                        self.sleep(1)
+            
+            section_seconds = time.monotonic() - section_start
+            self.cards_completed += cards_processed
+            self.card_seconds += section_seconds
+            self.metrics.increment("cards_completed", cards_processed)
+            self.metrics.increment("card_seconds", section_seconds)
+            if cards_processed:
+                print(f"Section throughput: {cards_processed / section_seconds * 60:.1f} cards/min")
+            if tracker.corrections:
+                print(f"Progress count corrected from the page {tracker.corrections} times")
+                
+            if cards_processed and self.last_card_state:
+                # Let the stats message catch up with the last card before the final read
+                self.wait_for("stats_changed", self.last_card_state['statsText'])
+            final_completed, final_total = self.get_flashcard_progress()
+            if final_completed == final_total:
+                print(f"\n✨ Section successfully completed! All {final_total} cards mastered ✨")
+            else:
+                print(f"\nFinal progress: {final_completed}/{final_total}")
+                if final_completed < final_total:
+                    print(f"Note: {final_total - final_completed} cards still need work")
+            
+            outcome = "complete" if final_total and final_completed == final_total else "incomplete"
+            self._record_checkpoint(deck_url, "finish", final_completed, final_total, outcome=outcome)
+            return (final_completed, final_total) if final_total else None
+            
+        except Exception as e:
+            print(f"Error processing flashcards: {str(e)}")
+            self.artifacts.capture("section-error", e)
+            self._record_checkpoint(deck_url, "finish", outcome="failed")
+            return None
+        finally:
+            print("Finished processing section")
+
+    def get_total_flashcards(self) -> int:
+        """Get total number of flashcards in current section"""
+        try:
+            self.wait.until(EC.presence_of_element_located((By.CLASS_NAME, "deck-stats-message")))
+            
+            total_cards = self._execute_script('''
+                const statsText = document.querySelector("div[data-flashcards-mastering-target='deckStatsMessage'] p").textContent;
+                const match = statsText.match(/out of (\\d+) cards/);
+                return match ? parseInt(match[1]) : 0;
+            ''')
+            
+            if total_cards:
+                print(f"Found {total_cards} total flashcards in this section")
+                return total_cards
+            
+            stats_element = self.driver.find_element(By.CSS_SELECTOR, 
+                "div[data-flashcards-mastering-target='deckStatsMessage'] strong")
+            if stats_element:
+                text = stats_element.text
+                try:
+                    number = int(text)
+                    print(f"Found {number} total flashcards using fallback method")
+                    return number
+                except ValueError:
+                    print(f"Could not parse number from text: {text}")
+                    
+            print("Could not determine total number of flashcards")
+            return 0
+            
+        except Exception as e:
+            print(f"Error getting total flashcards: {str(e)}")
+            self.artifacts.capture("flashcard-count-error", e)
+            return 0
+
+    def _execute_script(self, script: str, *args):
+        """Run a synchronous script"""
+        return self.driver.execute_script(script, *args)
+
+    def _execute_async_script(self, script: str, *args):
+        """Run an async script that resolves via its callback"""
+        return self.driver.execute_async_script(script, *args)
+
+    def _call_helper(self, call: str, *args):
+        """Call a page helper method in one round-trip, installing the helper first if the page lacks it.
+        
+        args are passed through to the script, so call can refer to them as arguments[0], ...
+        """
+        result = self._execute_script(f"return window.__flashcardooor ? [window.__flashcardooor.{call}] : null;", *args)
+        if result is None:
+            result = self._execute_script(CARD_HELPER_JS + f"\nreturn [window.__flashcardooor.{call}];", *args)
+        return result[0]
+
+    @timed("question_read")
+    def get_card_state(self) -> Dict:
+        """Read the whole card state in one round-trip"""
+        state = self._call_helper("state()")
+        self.artifacts.snapshot(state)
+        return state
+
+    def prefetch_deck_answers(self, deck_url: str):
+        """Request answers for every question the deck already exposes, plus ones seen on earlier visits"""
+        try:
+            questions = list(self.deck_questions.get(deck_url, []))
+            for question in self._call_helper("questions()"):
+                if question not in questions:
+                    questions.append(question)
+                    
+            if questions:
+                print(f"Prefetching answers for {len(questions)} known questions "
+                      f"({self.answer_pipeline.max_workers} at a time)")
+                self.answer_pipeline.prefetch(questions, deck_url)
+        except Exception as e:
+            print(f"Error prefetching deck answers: {str(e)}")
+
+    def handle_flashcard(self, state: Optional[Dict] = None, deck_url: Optional[str] = None) -> bool:
+        """Process a single flashcard using the in-page helper to minimise round-trips"""
+        try:
+            print("\nProcessing flashcard...")
+            
+            if state is None:
+                state = self.get_card_state()
+            if not state['present']:
+                def card_present(_):
+                    current = self.get_card_state()
+                    return current if current['present'] else False
+                
+                state = WebDriverWait(self.driver, 5).until(card_present)
+            
+            self.last_card_state = state
+            
+            if state['flipped']:
+                print("Card is already flipped, moving to next...")
+                result = self._execute_async_script(
+                    "window.__flashcardooor.clickKnewIt(arguments[0], arguments[arguments.length - 1]);",
+                    KNEW_IT_TIMEOUT_MS
+                )
+                if not (result and result.get('ok')) and not self.finish_card_by_clicks():
+                    return False
+                self.wait_for("card_changed", state['cardVersion'], baseline=2)
+                return True
+            
+            question = state['question']
+            if not question:
+                print("No question found")
+                return False
+                
+            print(f"Found question: {question}")
+            
+            if not state['flipVisible']:
+                print("Flip button not found or not visible")
+                return False
+            
+            try:
+                if self.stream_answers and not self.answer_pipeline.pending(question):
+                    answer = self.stream_answer(question, deck_url)
+                else:
+                    with self.metrics.span("answer_wait"):
+                        answer = self.answer_pipeline.result(question, deck_url)
+            except LLMError as e:
+                print(f"No answer for this card ({str(e)}) - it will be retried")
+                return False
+            
+            print("Entering answer, flipping card and waiting for 'I knew it'...")
+            result = self._execute_async_script(
+                "window.__flashcardooor.answer(arguments[0], arguments[1], arguments[arguments.length - 1]);",
+                answer,
+                KNEW_IT_TIMEOUT_MS
+            )
+            
+            if not result or not result.get('ok'):
+                error = result.get('error') if result else 'no result from page helper'
+                print(f"Page helper could not complete the card: {error}")
+                if error == "answer textarea not found" or not self.finish_card_by_clicks():
+                    return False
+            else:
+                timings = result.get('timings', {})
+                self.metrics.record("answer_entry", timings.get('answerEntry', 0) / 1000)
+                self.metrics.record("flip", timings.get('flip', 0) / 1000)
+                self.metrics.record("knew_it_click", timings.get('knewItClick', 0) / 1000)
+                
+            print("Successfully completed flashcard")
+            # Replaces the 2 s post-card sleep plus the 1 s sleep in the section loop
+            self.wait_for("card_changed", state['cardVersion'], baseline=3)
+            return True
+            
+        except Exception as e:
+            print(f"Error handling flashcard: {str(e)}")
+            self.artifacts.capture("flashcard-error", e)
+            return False
+
+    def finish_card_by_clicks(self) -> bool:
+        """Flip the card if needed and click "I knew it" with wait_and_click, for when the page
+        helper's in-page clicks did not take"""
+        if not self.get_card_state()['flipped'] and not self.wait_and_click(
+            FLIP_BUTTON_SELECTOR, timeout=5, clickable=True
+        ):
+            return False
+        return self.wait_and_click(KNEW_IT_BUTTON_SELECTOR, timeout=KNEW_IT_TIMEOUT_MS / 1000, clickable=True)
+
+    def print_throughput(self):
+        """Print overall cards per minute across all processed sections"""
+        if self.cards_completed and self.card_seconds:
+            print(f"Throughput: {self.cards_completed} cards in {self.card_seconds:.0f}s "
+                  f"({self.cards_completed / self.card_seconds * 60:.1f} cards/min)")
+
+    def print_round_trip_stats(self):
+        """Print WebDriver round-trips spent per card"""
+        if not self.card_round_trips:
+            return
+        average = sum(self.card_round_trips) / len(self.card_round_trips)
+        print(f"WebDriver round-trips: {average:.1f} per card on average over {len(self.card_round_trips)} cards "
+              f"(max {max(self.card_round_trips)})")
+              
+    def start(self, homepage_url: str):
+        """Start automation from homepage"""
+        self.homepage_url = homepage_url
+        self.ensure_browser()
+        self.driver.get(homepage_url)
+        self.wait_for("document_ready", baseline=3)
+        
+    def find_all_modules(self) -> List[Dict]:
+        """Find all main module categories"""
+        modules = []
+        module_elements = self.driver.find_elements(By.CSS_SELECTOR, ".module-header")
+        
+        for element in module_elements:
+            try:
+                name = element.find_element(By.CSS_SELECTOR, ".module-header-name").text
+                href = element.get_attribute("href")
+                modules.append({
+                    "name": name,
+                    "href": href,
+                    "element": element
+                })
+            except NoSuchElementException:
+                continue
+                
+        return modules
+    
+    def expand_module(self, module_element) -> List[Dict]:
+        """Click on module and find all subcategories"""
+        module_element.click()
+        self.sleep(1)
+        
+        subcategories = []
+        day_elements = self.driver.find_elements(By.CSS_SELECTOR, ".day")
+        
+        for day in day_elements:
+            try:
+                title = day.find_element(By.CSS_SELECTOR, "div").text
+                subcategories.append({
+                    "title": title,
+                    "element": day
+                })
+            except NoSuchElementException:
+                continue
+                
+        return subcategories
+    
+    def _cached_answer(self, question: str, deck: Optional[str] = None) -> Optional[str]:
+        """Answer from the exact-match cache (by the model the router would ask now), else from a
+        confident fuzzy match of an earlier question"""
+        if self.answer_cache is not None:
+            cached = self.answer_cache.get(question, self.llm_client.router.route(question, deck).model)
+            if cached is not None:
+                print("Using cached answer")
+                if self.trace:
+                    self.trace.record("answer", question=question, answer=cached, source="cache")
+                return cached
+        
+        if self.fuzzy_index is not None:
+            with self.metrics.span("fuzzy_lookup"):
+                match = self.fuzzy_index.match(question)
+            if match:
+                matched_question, answer, score = match
+                print(f"Reusing answer to a similar question ({score:.2f}): {matched_question}")
+                if self.trace:
+                    self.trace.record("answer", question=question, answer=answer, source="fuzzy")
+                return answer
+        return None
+    
+    def _store_answer(self, question: str, answer: str, model: str, routed_model: Optional[str] = None):
+        """Cache answer under the model that actually gave it and, when a batch sent the question to
+        a stronger model than its own route, also under routed_model so later single lookups hit"""
+        if self.answer_cache is not None:
+            self.answer_cache.put(question, model, answer)
+            if routed_model and routed_model != model:
+                self.answer_cache.put(question, routed_model, answer)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.add(question, answer)
+    
+    @timed("llm_call")
+    def get_claude_response(self, question: str, deck: Optional[str] = None) -> str:
+        """Get response from Claude, consulting the answer cache and fuzzy question index first.
+        
+        Raises LLMError when no answer could be obtained, so the card is retried instead of
+        being submitted with an error message as its answer.
+        """
+        cached = self._cached_answer(question, deck)
+        if cached is not None:
+            return cached
+
+        try:
+            answer = self.llm_client.answer(question, deck)
+        except LLMError as e:
+            print(f"Error calling Claude API: {str(e)}")
+            raise
+
+        self._store_answer(question, answer.text, answer.model)
+        return answer.text
+    
+    @timed("llm_stream")
+    def stream_answer(self, question: str, deck: Optional[str] = None) -> str:
+        """Stream Claude's answer straight into the textarea, stopping once the answer budget is reached.
+        
+        The textarea is filled on the first chunk and then at most every stream_update_interval
+        seconds (never again when the interval is 0 or None). Raises LLMError like get_claude_response.
+        """
+        cached = self._cached_answer(question, deck)
+        if cached is not None:
+            return cached
+        
+        print("Streaming answer from Claude...")
+        route = self.llm_client.router.route(question, deck)
+        started = time.perf_counter()
+        text = ""
+        first_chunk = True
+        last_fill = None
+        budget_reached = False
+        stream = self.llm_client.stream(question, route)
+        try:
+            for chunk in stream:
+                now = time.perf_counter()
+                if first_chunk:
+                    self.metrics.record("llm_first_chunk", now - started)
+                    first_chunk = False
+                text, budget_reached = apply_answer_budget(
+                    text + chunk, self.answer_max_chars, self.answer_max_sentences
+                )
+                if budget_reached:
+                    print(f"Answer budget reached after {len(text)} characters - stopping the stream")
+                    break
+                if last_fill is None or (self.stream_update_interval and now - last_fill >= self.stream_update_interval):
+                    self._call_helper("fill(arguments[0])", text)
+                    last_fill = now
+        except LLMError as e:
+            print(f"Error streaming from Claude API: {str(e)}")
+            raise
+        finally:
+            stream.close()
+        
+        if not budget_reached:
+            # The stream ended on its own; only text beyond the budget counts as cut
+            trimmed, _ = apply_answer_budget(text, self.answer_max_chars, self.answer_max_sentences, final=True)
+            budget_reached = trimmed.strip() != text.strip()
+            text = trimmed
+        text = text.strip()
+        if not text:
+            raise LLMError("Claude streamed an empty answer")
+        if budget_reached:
+            # A cut answer is good enough for this card but should not be reused as the full answer
+            self.metrics.increment("answers_cut_by_budget")
+        else:
+            self._store_answer(question, text, route.model)
+        return text
+    
+    @timed("llm_batch_call")
+    def get_claude_responses(self, questions: List[str], deck: Optional[str] = None) -> Dict[str, str]:
+        """Answer several questions at once: cached ones from the cache, the rest in one batched request.
+        
+        Questions that could not be answered are left out of the result.
+        """
+        answers = {}
+        uncached = []
+        for question in questions:
+            cached = self._cached_answer(question, deck)
+            if cached is not None:
+                answers[question] = cached
+            else:
+                uncached.append(question)
+        
+        if uncached:
+            print(f"Asking Claude {len(uncached)} questions in one request")
+            for question, answer in zip(uncached, self.llm_client.answer_batch(uncached, deck)):
+                if answer is None:
+                    continue
+                answers[question] = answer.text
+                routed_model = self.llm_client.router.route(question, deck).model
+                self._store_answer(question, answer.text, answer.model, routed_model)
+        
+        return answers
+    
+    @timed("module_discovery")
+    def find_all_modules(self) -> List[Dict]:
+        """Find all main module categories using improved JavaScript"""
+        try:
+            print("Searching for modules...")
+            
+            modules = self.driver.execute_script('''
+                const moduleElements = document.querySelectorAll(".modules-nav > a");
+                return Array.from(moduleElements).map(element => {
+                    // Get the name from the module-header-name element
+                    const nameElement = element.querySelector(".module-header-name");
+                    const name = nameElement ? nameElement.textContent.trim() : "";
+                    
+                    // Get the href attribute
+                    const href = element.href;
+                    
+                    // Get data attributes that might be useful for navigation
+                    const path = element.getAttribute("href");
+                    
+                    // Debug info
+                    console.log("Found module:", {
+                        name: name,
+                        href: href,
+                        path: path
+                    });
+                    
+                    return {
+                        name: name || "Unknown",
+                        href: href || "",
+                        path: path || "",
+                        isActive: element.classList.contains("active")
+                    };
+                }).filter(module => module.href); // Only return modules with valid hrefs
+            ''')
+            
+            if not modules:
+                print("No modules found - trying alternative selector...")
+                modules = self.driver.execute_script('''
+                    const moduleElements = document.querySelectorAll("[data-original-title]");
+                    return Array.from(moduleElements).map(element => ({
+                        name: element.getAttribute("data-original-title") || "Unknown",
+                        href: element.href,
+                        path: element.getAttribute("href"),
+                        isActive: element.classList.contains("active")
+                    })).filter(module => module.href);
+                ''')
+            
+            print(f"\nFound {len(modules)} modules:")
+            for module in modules:
+                print(f"- {module['name']} ({module['path']})")
+                
+            return modules
+        except Exception as e:
+            print(f"Error finding modules: {str(e)}")
+            self.artifacts.capture("module-detection-error", e)
+            return []
+
+    @timed("deck_harvest")
+    def harvest_module_decks(self) -> List[Dict]:
+        """Every flashcard deck of the current module page, read in one script.
+        
+        Each day's deck link is already in the DOM inside its collapsed exercises container, so no
+        day is expanded and each link is taken from its own day (as parse_days does over HTTP).
+        """
+        try:
+            days = self.driver.execute_script('''
+                return Array.from(document.querySelectorAll("#days-nav .day")).map(day => {
+                    const titleElement = day.querySelector("div");
+                    const exercises = day.nextElementSibling;
+                    const link = exercises && exercises.querySelector("a.exercise.nav-flashcards");
+                    return {
+                        title: (titleElement || day).textContent.trim() || "Unknown",
+                        url: link ? link.href : null
+                    };
+                }).filter(day => day.url);
+            ''')
+        except WebDriverException as e:
+            print(f"Error reading deck links: {str(e)}")
+            self.artifacts.capture("deck-harvest-error", e)
+            return []
+        
+        for day in days:
+            print(f"- {day['title']}: {day['url']}")
+        return [
+            {"title": day['title'], "decks": [{"url": day['url'], "completed": 0, "total": 0}]}
+            for day in days
+        ]
+
+    @timed("module_navigation")
+    def navigate_to_module(self, module: Dict) -> bool:
+        """Navigate to a specific module with improved error handling"""
+        try:
+            if not module.get('path') and not module.get('href'):
+                print("No valid navigation path found for module")
+                return False
+                
+            print(f"\nNavigating to module: {module['name']}")
+            
+            selector = ", ".join(
+                f'a[href={css_string(link)}]' for link in (module.get('path'), module.get('href')) if link
+            )
+            if self.wait_and_click(selector, timeout=5, key="module-link", navigates=True):
+                self.wait_for("page_replaced", baseline=2)
+                return True
+            
+            print("Attempting direct navigation...")
+            navigation_url = module.get('href') or module.get('path')
+            if navigation_url:
+                if not navigation_url.startswith('http'):
+                    base_url = self.driver.current_url.split('?')[0]
+                    navigation_url = f"{base_url}{navigation_url}"
+                
+                print(f"Navigating to: {navigation_url}")
+                self.driver.get(navigation_url)
+                self.wait_for("document_ready", baseline=2)
+                return True
+                
+            print("All navigation attempts failed")
+            return False
+            
+        except Exception as e:
+            print(f"Error navigating to module: {str(e)}")
+            self.artifacts.capture("navigation-error", e)
+            return False
+
+
+    def crawl_curriculum(self) -> List[Dict]:
+        """Discover the module → day → flashcard deck tree without processing any decks"""
+        modules = self.find_all_modules()
+        tree = []
+        
+        for module in modules:
+            print(f"\n{'='*20}")
+            print(f"Indexing module: {module['name']}")
+            print(f"{'='*20}")
+            
+            with self.metrics.span("module", label=module['name']):
+                if not self.navigate_to_module(module):
+                    print(f"Skipping module {module['name']} due to navigation error")
+                    continue
+                
+                days = self.harvest_module_decks()
+            
+            tree.append({
+                "name": module['name'],
+                "href": module['href'],
+                "path": module['path'],
+                "days": days
+            })
+            print(f"Indexed {len(days)} flashcard decks in {module['name']}")
+            
+        return tree
+
+    def prepare_http_crawler(self) -> bool:
+        """Hand the browser's session to the HTTP crawler. Returns whether HTTP reads can be used."""
+        if not self.http_crawler:
+            return False
+        try:
+            self.http_crawler.load_cookies(self.driver)
+            return True
+        except WebDriverException as e:
+            print(f"Could not copy browser cookies for HTTP crawling: {str(e)}")
+            return False
+    
+    def crawl_curriculum_over_http(self) -> Optional[List[Dict]]:
+        """crawl_curriculum without the browser, or None if the pages could not be read that way"""
+        try:
+            with self.metrics.span("http_crawl"):
+                modules = self.http_crawler.crawl_curriculum(self.homepage_url)
+        except HttpCrawlError as e:
+            print(f"HTTP crawl failed ({str(e)}) - crawling in the browser")
+            return None
+        if not any(module['days'] for module in modules):
+            print("No flashcard decks found over HTTP - crawling in the browser")
+            return None
+        return modules
+    
+    def scan_deck_progress(self):
+        """Refresh every pending deck's progress over HTTP, so the browser only opens decks that need work"""
+        urls = [deck['url'] for deck in self.curriculum_index.pending_decks()]
+        if not urls:
+            return
+        started = time.monotonic()
+        with self.metrics.span("http_progress_scan"):
+            progress = self.http_crawler.deck_progress(urls)
+        for url, (completed, total) in progress.items():
+            self.curriculum_index.update_progress(url, completed, total)
+        self.curriculum_index.save()
+        complete = sum(1 for completed, total in progress.values() if total and completed >= total)
+        print(f"Checked {len(progress)}/{len(urls)} pending decks over HTTP in {time.monotonic() - started:.1f}s "
+              f"({complete} already complete)")
+    
+    def process_paths(self, paths: List[Tuple[str, CurriculumIndex]], resume: bool = False):
+        """Process several camp paths (homepage URL and its curriculum index) in one session.
+        
+        The browser login, answer cache, Claude client, HTTP connection pool, metrics and time
+        budget are shared; a combined summary is printed once at the end.
+        """
+        self.scheduler.start_clock()
+        results = []
+        try:
+            for homepage_url, index in paths:
+                if self.scheduler.expired():
+                    print(f"\nTime budget used up - skipping path {homepage_url}")
+                    break
+                if len(paths) > 1:
+                    print(f"\n{'#'*20}\nPath: {homepage_url}\n{'#'*20}")
+                if homepage_url != self.homepage_url:
+                    self.start(homepage_url)
+                self.curriculum_index = index
+                
+                cards_before = self.cards_completed
+                decks_before = self.metrics.counters.get("decks_processed", 0)
+                started = time.monotonic()
+                with self.metrics.span("path", label=homepage_url):
+                    self.process_all_content(resume=resume, summarize=False)
+                results.append({
+                    "url": homepage_url,
+                    "decks": self.metrics.counters.get("decks_processed", 0) - decks_before,
+                    "pending": len(index.pending_decks()),
+                    "cards": self.cards_completed - cards_before,
+                    "seconds": time.monotonic() - started
+                })
+        finally:
+            if len(results) > 1:
+                self.print_path_summary(results)
+            self.print_run_summary()
+    
+    def print_path_summary(self, results: List[Dict]):
+        print(f"\n{'Path':<60}{'Decks':>7}{'Left':>6}{'Cards':>7}{'Time':>9}")
+        for result in results:
+            print(f"{result['url'][-58:]:<60}{result['decks']:>7.0f}{result['pending']:>6}"
+                  f"{result['cards']:>7}{result['seconds'] / 60:>8.1f}m")
+        print(f"{'All paths':<60}{sum(r['decks'] for r in results):>7.0f}{sum(r['pending'] for r in results):>6}"
+              f"{sum(r['cards'] for r in results):>7}{sum(r['seconds'] for r in results) / 60:>8.1f}m")
+    
+    def process_all_content(self, resume: bool = False, summarize: bool = True):
+        """Main method to process all unfinished flashcard decks, crawling the curriculum only when needed.
+        
+        With resume, decks the run ledger marks complete are skipped without being opened, the
+        deck that was in progress when the last run stopped goes first, and an existing index is
+        reused regardless of its age. summarize=False leaves the end-of-run summary to the caller.
+        """
+        try:
+            index = self.curriculum_index
+            use_http = self.prepare_http_crawler()
+            
+            if index.is_stale(self.homepage_url, ignore_age=resume):
+                print("Curriculum index missing or stale - crawling modules...")
+                modules = self.crawl_curriculum_over_http() if use_http else None
+                if not modules:
+                    modules = self.crawl_curriculum()
+                
+                if not modules:
+                    print("No modules found")
+                    self.artifacts.capture("no-modules-found")
+                    return
+                
+                index.set_modules(self.homepage_url, modules)
+                index.save()
+            else:
+                crawled_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(index.data['crawled_at']))
+                print(f"Using curriculum index from {crawled_at}")
+            
+            if use_http:
+                self.scan_deck_progress()
+            
+            pending = self.scheduler.order(index.pending_decks())
+            
+            if resume and self.run_ledger:
+                interrupted = self.run_ledger.interrupted_deck()
+                pending = self.run_ledger.resume_order(pending)
+                if interrupted and pending and pending[0]['url'] == interrupted:
+                    print(f"Resuming interrupted deck first: {interrupted}")
+            
+            print(f"\n{len(pending)} of {len(index.decks())} flashcard decks still need work "
+                  f"({self.scheduler.policy} order)")
+            
+            for module_name, decks in groupby(self.scheduler.schedule(pending), key=lambda deck: deck['module']):
+                with self.metrics.span("module", label=module_name):
+                    for deck in decks:
+                        print(f"\n{'-'*20}")
+                        print(f"Deck: {deck['module']} / {deck['day']}")
+                        
+                        if deck.get('questions'):
+                            self.deck_questions.setdefault(deck['url'], list(deck['questions']))
+                        self.ensure_browser()
+                        self.check_memory()
+                        
+                        cards_before, card_seconds_before = self.cards_completed, self.card_seconds
+                        with self.metrics.span("deck", label=deck['url']), self.deck_scope(deck['url']):
+                            progress = self.process_flashcards_section(deck['url'])
+                        self.metrics.increment("decks_processed")
+                        self.scheduler.record_deck(
+                            self.cards_completed - cards_before, self.card_seconds - card_seconds_before
+                        )
+                        
+                        if progress:
+                            index.update_progress(deck['url'], *progress, questions=self.deck_questions.get(deck['url']))
+                        else:
+                            print("Deck could not be processed - the index will be rebuilt on the next run")
+                            index.mark_stale()
+                        index.save()
+            
+            if self.scheduler.left:
+                print(f"\nTime budget used up - {len(self.scheduler.left)} decks left for the next run")
+                
+        except Exception as e:
+            print(f"Critical error in process_all_content: {str(e)}")
+            self.artifacts.capture("critical-error", e)
+        finally:
+            if summarize:
+                self.print_run_summary()
+    
+    def print_run_summary(self):
+        """Print every component's statistics and export the run metrics"""
+        self.print_throughput()
+        self.print_round_trip_stats()
+        self.wait_report.print_report()
+        if self.answer_cache is not None:
+            self.answer_cache.print_stats()
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.print_stats()
+        self.llm_client.print_stats()
+        self.artifacts.print_stats()
+        self.click_strategies.print_stats()
+        if self.trace:
+            self.trace.print_stats()
+        if self.memory_watchdog:
+            self.memory_watchdog.print_stats()
+            self.metrics.increment("chrome_peak_rss_mb", round(self.memory_watchdog.peak_rss_mb))
+            self.metrics.increment("js_heap_peak_mb", round(self.memory_watchdog.peak_heap_mb))
+        self.metrics.increment("webdriver_round_trips", self.round_trips)
+        self.metrics.increment("llm_cost_usd", self.llm_client.router.total_cost)
+        self.metrics.print_summary()
+        self.metrics.export()
+
+    def cleanup(self):
+        """Close the browser"""
+        self.answer_pipeline.shutdown()
+        self.llm_client.close()
+        self.artifacts.close()
+        self.click_strategies.save()
+        if self.http_crawler:
+            self.http_crawler.close()
+        if self.browser:
+            self.browser.close(self.driver)
+        else:
+            self.driver.quit()
+        if self.run_ledger:
+            self.run_ledger.close()
+        if self.answer_cache is not None:
+            self.answer_cache.close()
+        if self.trace:
+            self.trace.close()
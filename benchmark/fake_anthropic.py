@@ -0,0 +1,74 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+
+class FakeStream:
+    """Async context manager mimicking messages.stream: the first words arrive after a fraction
+    of the latency and the rest trickle in over the remainder"""
+
+    def __init__(self, client: "FakeAnthropic", answer: str):
+        self.client = client
+        self.words = answer.split(" ")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        await asyncio.sleep(self.client.latency * 0.2)
+        per_word = self.client.latency * 0.8 / max(len(self.words), 1)
+        for i, word in enumerate(self.words):
+            yield word if i == 0 else " " + word
+            await asyncio.sleep(per_word)
+
+
+class FakeMessages:
+    def __init__(self, client: "FakeAnthropic"):
+        self.client = client
+
+    def stream(self, model: str, max_tokens: int, messages: list, **kwargs):
+        question = messages[-1]["content"]
+        with self.client.lock:
+            self.client.calls += 1
+        return FakeStream(self.client, self.client.answer_for(question))
+
+    async def create(self, model: str, max_tokens: int, messages: list, system: str = "", **kwargs):
+        question = messages[-1]["content"]
+        with self.client.lock:
+            self.client.calls += 1
+        await asyncio.sleep(self.client.latency)
+        if system and "JSON array" in system:
+            # A batched request: reply the way the batch system prompt asks for
+            answer = json.dumps([
+                {"id": item["id"], "answer": self.client.answer_for(item["question"])}
+                for item in json.loads(question)
+            ])
+        else:
+            answer = self.client.answer_for(question)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=answer)],
+            usage=SimpleNamespace(input_tokens=len(question) // 4 + 1, output_tokens=len(answer) // 4 + 1),
+            model=model
+        )
+
+
+class FakeAnthropic:
+    """Stand-in for anthropic.AsyncAnthropic that answers after a configurable latency"""
+
+    def __init__(self, latency: float = 1.0, answer_sentences: int = 1):
+        self.latency = latency
+        self.answer_sentences = answer_sentences
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.messages = FakeMessages(self)
+
+    def answer_for(self, question: str) -> str:
+        """A canned answer; answer_sentences > 1 makes it verbose, like a real completion often is"""
+        sentences = [f"A short answer to: {question}."]
+        sentences += [f"Further detail number {i} about it." for i in range(1, self.answer_sentences)]
+        return " ".join(sentences)
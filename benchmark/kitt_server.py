@@ -0,0 +1,145 @@
+import json
+import os
+import random
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from typing import Dict, List
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str) -> Template:
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return Template(f.read())
+
+
+def stats_message(mastered: int, total: int) -> str:
+    """The deck stats message as the server renders it (the page script keeps it up to date)"""
+    if mastered == 0:
+        return f"You still need to master all {total} cards in this deck"
+    if mastered >= total:
+        return f"You have mastered all {total} cards in this deck!"
+    return f"You have mastered {mastered} out of {total} cards in this deck"
+
+
+class FakeKitt:
+    """In-memory curriculum served as pages that reproduce the Kitt DOM the bot relies on"""
+
+    def __init__(self, modules: int = 2, days: int = 3, deck_size: int = 10, flashcard_days: float = 1.0,
+                 question_pool: int = 0, expand_delay_ms: int = 150, flip_delay_ms: int = 300,
+                 transition_delay_ms: int = 400, seed: int = 0):
+        rng = random.Random(seed)
+        self.expand_delay_ms = expand_delay_ms
+        self.flip_delay_ms = flip_delay_ms
+        self.transition_delay_ms = transition_delay_ms
+        self.lock = threading.Lock()
+        self.modules: List[Dict] = []
+        self.decks: Dict[str, Dict] = {}
+
+        # question_pool > 0 draws questions from a shared pool, so some repeat across decks
+        question_number = 0
+        for m in range(1, modules + 1):
+            module = {"slug": f"module-{m}", "name": f"Module {m}", "days": []}
+            for d in range(1, days + 1):
+                day = {"title": f"Day {d}", "deck_id": None}
+                if rng.random() < flashcard_days:
+                    deck_id = f"m{m}-d{d}"
+                    questions = []
+                    for _ in range(deck_size):
+                        question_number += 1
+                        n = rng.randrange(question_pool) if question_pool else question_number
+                        questions.append(f"Question {n}: what does command_{n} do?")
+                    self.decks[deck_id] = {"id": deck_id, "questions": questions, "mastered": 0}
+                    day["deck_id"] = deck_id
+                module["days"].append(day)
+            self.modules.append(module)
+
+        self.module_template = load_fixture("module.html")
+        self.deck_template = load_fixture("deck.html")
+
+    def homepage_path(self) -> str:
+        return f"/camps/1/challenges?path={self.modules[0]['slug']}"
+
+    def total_cards(self) -> int:
+        return sum(len(deck["questions"]) for deck in self.decks.values())
+
+    def render_module(self, slug: str) -> str:
+        module = next((m for m in self.modules if m["slug"] == slug), self.modules[0])
+        nav = "\n".join(
+            f'    <a href="/camps/1/challenges?path={m["slug"]}" class="{"active" if m is module else ""}">'
+            f'<span class="module-header-name">{m["name"]}</span></a>'
+            for m in self.modules
+        )
+        days = []
+        for day in module["days"]:
+            days.append(f'        <div class="day"><div>{day["title"]}</div></div>')
+            link = (
+                f'<a class="exercise nav-flashcards" href="/camps/1/flashcards/{day["deck_id"]}">Flashcards</a>'
+                if day["deck_id"] else '<a class="exercise" href="#">Challenge</a>'
+            )
+            days.append(f'        <div class="exercises no-height">{link}</div>')
+        return self.module_template.substitute(
+            module_name=module["name"],
+            modules_nav=nav,
+            days="\n".join(days),
+            expand_delay_ms=self.expand_delay_ms
+        )
+
+    def render_deck(self, deck_id: str) -> str:
+        with self.lock:
+            deck = dict(self.decks[deck_id])
+        return self.deck_template.substitute(
+            deck_id=deck_id,
+            stats_text=stats_message(deck["mastered"], len(deck["questions"])),
+            deck_json=json.dumps(deck),
+            flip_delay_ms=self.flip_delay_ms,
+            transition_delay_ms=self.transition_delay_ms
+        )
+
+    def master_card(self, deck_id: str) -> int:
+        with self.lock:
+            deck = self.decks[deck_id]
+            deck["mastered"] = min(deck["mastered"] + 1, len(deck["questions"]))
+            return deck["mastered"]
+
+
+def make_handler(kitt: FakeKitt):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: str, content_type: str = "text/html"):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            module = re.match(r"^/camps/1/challenges\?path=([\w-]+)$", self.path)
+            deck = re.match(r"^/camps/1/flashcards/([\w-]+)$", self.path)
+            if module:
+                self._send(200, kitt.render_module(module.group(1)))
+            elif deck and deck.group(1) in kitt.decks:
+                self._send(200, kitt.render_deck(deck.group(1)))
+            else:
+                self._send(404, "Not found", "text/plain")
+
+        def do_POST(self):
+            match = re.match(r"^/api/decks/([\w-]+)/master$", self.path)
+            if match and match.group(1) in kitt.decks:
+                self._send(200, json.dumps({"mastered": kitt.master_card(match.group(1))}), "application/json")
+            else:
+                self._send(404, "Not found", "text/plain")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(kitt: FakeKitt, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start serving kitt on a background thread; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), make_handler(kitt))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,174 @@
+"""Offline throughput benchmark: runs process_all_content end to end against a local
+stand-in for the Kitt flashcard pages and a fake Anthropic client.
+
+    python benchmark/run_benchmark.py --modules 2 --days 3 --deck-size 10 --llm-latency 1.0
+
+Requires Chrome (run headless by default). Results are printed and written as JSON.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+
+from answer_cache import AnswerCache
+from curriculum_index import CurriculumIndex
+from automation import CLAUDE_MODEL, FlashcardAutomation
+from fuzzy_index import FuzzyQuestionIndex
+from http_crawler import HttpCrawler
+from llm_client import LLMClient
+from run_ledger import RunLedger
+from fake_anthropic import FakeAnthropic
+from kitt_server import FakeKitt, serve
+
+
+class SleepMeter:
+    """Replaces time.sleep to total the time the bot (and Selenium's polling) spends sleeping"""
+
+    def __init__(self):
+        self.real_sleep = time.sleep
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __call__(self, seconds: float):
+        self.calls += 1
+        self.seconds += seconds
+        self.real_sleep(seconds)
+
+
+class CommandCounter:
+    """Wraps the driver's command executor to count WebDriver commands"""
+
+    def __init__(self, driver):
+        self.counts = {}
+        self._execute = driver.command_executor.execute
+        driver.command_executor.execute = self.execute
+
+    def execute(self, command, params):
+        self.counts[command] = self.counts.get(command, 0) + 1
+        return self._execute(command, params)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark flashcardooor against local fixtures")
+    parser.add_argument("--modules", type=int, default=2)
+    parser.add_argument("--days", type=int, default=3, help="Days per module")
+    parser.add_argument("--deck-size", type=int, default=10, help="Cards per flashcard deck")
+    parser.add_argument("--flashcard-days", type=float, default=1.0,
+                        help="Fraction of days that have a flashcard deck")
+    parser.add_argument("--question-pool", type=int, default=0,
+                        help="Draw questions from a pool of this size so some repeat (0 = all unique)")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Seconds per fake Claude call")
+    parser.add_argument("--flip-delay-ms", type=int, default=300)
+    parser.add_argument("--transition-delay-ms", type=int, default=400)
+    parser.add_argument("--prefetch-workers", type=int, default=4)
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Concurrent fake Claude requests")
+    parser.add_argument("--answer-sentences", type=int, default=1,
+                        help="Sentences per fake answer, to simulate verbose completions")
+    parser.add_argument("--stream", action="store_true", help="Stream answers into the card")
+    parser.add_argument("--answer-max-sentences", type=int, default=2,
+                        help="Stop streaming after this many sentences (with --stream)")
+    parser.add_argument("--no-http-crawl", action="store_true",
+                        help="Crawl and check progress in the browser instead of over HTTP")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--output", default="benchmark-results.json")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    kitt = FakeKitt(
+        modules=args.modules,
+        days=args.days,
+        deck_size=args.deck_size,
+        flashcard_days=args.flashcard_days,
+        question_pool=args.question_pool,
+        flip_delay_ms=args.flip_delay_ms,
+        transition_delay_ms=args.transition_delay_ms
+    )
+    server = serve(kitt)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    print(f"Serving {len(kitt.decks)} decks / {kitt.total_cards()} cards at {base_url}")
+
+    chrome_options = webdriver.ChromeOptions()
+    if not args.headed:
+        chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--window-size=1280,1024")
+    driver = webdriver.Chrome(options=chrome_options)
+    commands = CommandCounter(driver)
+    claude = FakeAnthropic(latency=args.llm_latency, answer_sentences=args.answer_sentences)
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        bot = FlashcardAutomation(
+            "sk-benchmark",
+            answer_cache=AnswerCache(path=os.path.join(state_dir, "answer-cache.sqlite3")),
+            fuzzy_index=FuzzyQuestionIndex(),
+            prefetch_workers=args.prefetch_workers,
+            curriculum_index=CurriculumIndex(path=os.path.join(state_dir, "curriculum-index.json")),
+            run_ledger=RunLedger(os.path.join(state_dir, "run-ledger.jsonl")),
+            driver=driver,
+            llm_client=LLMClient(
+                api_key=None,
+                model=CLAUDE_MODEL,
+                requests_per_minute=1_000_000,
+                tokens_per_minute=1_000_000_000,
+                max_concurrency=args.llm_concurrency,
+                async_client=claude
+            ),
+            http_crawler=None if args.no_http_crawl else HttpCrawler(),
+            stream_answers=args.stream,
+            answer_max_sentences=args.answer_max_sentences
+        )
+
+        sleeps = SleepMeter()
+        time.sleep = sleeps
+        try:
+            bot.start(base_url + kitt.homepage_path())
+            commands.counts.clear()
+            start = time.monotonic()
+            bot.process_all_content()
+            elapsed = time.monotonic() - start
+        finally:
+            time.sleep = sleeps.real_sleep
+            bot.cleanup()
+            server.shutdown()
+
+    mastered = sum(deck["mastered"] for deck in kitt.decks.values())
+    waited = sum(t["waited"] for t in bot.wait_report.totals.values())
+    baseline = sum(t["baseline"] for t in bot.wait_report.totals.values())
+    results = {
+        "config": vars(args),
+        "decks": len(kitt.decks),
+        "cards_total": kitt.total_cards(),
+        "cards_mastered": mastered,
+        "elapsed_seconds": round(elapsed, 3),
+        "cards_per_second": round(mastered / elapsed, 4) if elapsed else 0,
+        "cards_per_minute": round(mastered / elapsed * 60, 2) if elapsed else 0,
+        "webdriver_calls": commands.total,
+        "webdriver_calls_per_card": round(commands.total / mastered, 2) if mastered else None,
+        "webdriver_calls_by_command": dict(sorted(commands.counts.items(), key=lambda item: -item[1])),
+        "llm_calls": claude.calls,
+        "sleep_seconds": round(sleeps.seconds, 3),
+        "sleep_calls": sleeps.calls,
+        "event_wait_seconds": round(waited, 3),
+        "replaced_sleep_baseline_seconds": round(baseline, 3)
+    }
+
+    print(json.dumps(results, indent=2))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
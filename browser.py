@@ -0,0 +1,130 @@
+import os
+import shutil
+import subprocess
+import time
+from typing import Optional
+
+import requests
+from selenium import webdriver
+
+# Tried in order when CHROME_BINARY is not set
+CHROME_BINARIES = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "chrome",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+# Seconds to wait for a freshly launched Chrome to open its debugging port
+DEBUGGER_STARTUP_TIMEOUT = 15
+
+
+def find_chrome_binary() -> Optional[str]:
+    for candidate in CHROME_BINARIES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    return None
+
+
+def debugger_ready(address: str, timeout: float = 1.0) -> bool:
+    """Whether a Chrome DevTools endpoint is listening at host:port"""
+    try:
+        return requests.get(f"http://{address}/json/version", timeout=timeout).ok
+    except requests.RequestException:
+        return False
+
+
+class BrowserManager:
+    """Starts, attaches to and relaunches the Chrome instance the bot drives.
+
+    With debugger_address the bot attaches to a long-lived Chrome listening on that
+    remote-debugging address, launching one (detached, so it outlives the run) if nothing is
+    listening. With user_data_dir Chrome keeps its profile, and so the Kitt login, between runs.
+    Without either a fresh Chrome is started as before.
+    """
+
+    def __init__(
+        self,
+        debugger_address: Optional[str] = None,
+        user_data_dir: Optional[str] = None,
+        chrome_binary: Optional[str] = None
+    ):
+        self.debugger_address = debugger_address
+        self.user_data_dir = os.path.abspath(os.path.expanduser(user_data_dir)) if user_data_dir else None
+        self.chrome_binary = chrome_binary
+        self.attached = False
+
+    def start(self) -> webdriver.Chrome:
+        options = webdriver.ChromeOptions()
+
+        if self.debugger_address:
+            if not debugger_ready(self.debugger_address):
+                self.launch_debuggable_chrome()
+            options.add_experimental_option("debuggerAddress", self.debugger_address)
+            driver = webdriver.Chrome(options=options)
+            self.attached = True
+            print(f"Attached to Chrome at {self.debugger_address}")
+            return driver
+
+        # Chrome options for better stability
+        options.add_argument('--start-maximized')
+        options.add_argument('--disable-popup-blocking')
+        if self.user_data_dir:
+            options.add_argument(f'--user-data-dir={self.user_data_dir}')
+        return webdriver.Chrome(options=options)
+
+    def launch_debuggable_chrome(self):
+        """Start a detached Chrome with remote debugging on debugger_address"""
+        binary = self.chrome_binary or find_chrome_binary()
+        if not binary:
+            raise RuntimeError("Chrome not found - set CHROME_BINARY to attach to a warm browser")
+        port = self.debugger_address.rsplit(":", 1)[-1]
+        user_data_dir = self.user_data_dir or os.path.abspath(".chrome-profile")
+
+        print(f"No browser listening at {self.debugger_address} - launching Chrome with profile {user_data_dir}")
+        subprocess.Popen(
+            [
+                binary,
+                f"--remote-debugging-port={port}",
+                f"--user-data-dir={user_data_dir}",
+                "--no-first-run",
+                "--no-default-browser-check",
+                "--start-maximized",
+                "--disable-popup-blocking",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+
+        deadline = time.monotonic() + DEBUGGER_STARTUP_TIMEOUT
+        while not debugger_ready(self.debugger_address):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Chrome did not open {self.debugger_address} within {DEBUGGER_STARTUP_TIMEOUT}s")
+            time.sleep(0.2)
+
+    @staticmethod
+    def is_alive(driver) -> bool:
+        """Health check: the browser answers a trivial script"""
+        try:
+            return driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def relaunch(self, driver) -> webdriver.Chrome:
+        """Replace a dead browser session with a new one"""
+        self.close(driver)
+        return self.start()
+
+    def close(self, driver):
+        """End the session; an attached browser is left running for the next run"""
+        try:
+            if self.attached:
+                driver.service.stop()
+            else:
+                driver.quit()
+        except Exception as e:
+            print(f"Error closing browser: {str(e)}")
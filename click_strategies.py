@@ -0,0 +1,66 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+# Default cascade, cheapest first
+CLICK_STRATEGIES = ("standard", "javascript", "actions", "href")
+
+
+class ClickStrategyCache:
+    """Per-selector memo of which click strategy works, persisted between runs.
+
+    The strategy that last succeeded for a selector is tried first, then the others by success
+    rate, so repeated elements stop paying for attempts that are known to fail.
+    """
+
+    def __init__(self, path: Optional[str] = "click-strategies.json"):
+        self.path = path
+        self.selectors: Dict[str, Dict] = {}
+        self.first_try_hits = 0
+        self.wasted_attempts = 0
+
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.selectors = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not read click strategies {path}: {str(e)} - starting fresh")
+
+    def order(self, selector: str) -> List[str]:
+        entry = self.selectors.get(selector)
+        if not entry:
+            return list(CLICK_STRATEGIES)
+
+        def rank(strategy: str):
+            stats = entry["strategies"].get(strategy, {"successes": 0, "failures": 0})
+            attempts = stats["successes"] + stats["failures"]
+            success_rate = stats["successes"] / attempts if attempts else 0.5
+            return (strategy != entry.get("last_success"), -success_rate, CLICK_STRATEGIES.index(strategy))
+
+        return sorted(CLICK_STRATEGIES, key=rank)
+
+    def record(self, selector: str, strategy: str, succeeded: bool, attempt: int):
+        """Count one attempt; attempt is its position in the order tried (0 = first)"""
+        entry = self.selectors.setdefault(selector, {"last_success": None, "strategies": {}})
+        stats = entry["strategies"].setdefault(strategy, {"successes": 0, "failures": 0})
+        if succeeded:
+            stats["successes"] += 1
+            entry["last_success"] = strategy
+            if attempt == 0:
+                self.first_try_hits += 1
+        else:
+            stats["failures"] += 1
+            self.wasted_attempts += 1
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.selectors, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def print_stats(self):
+        if self.first_try_hits or self.wasted_attempts:
+            print(f"Click strategies: {self.first_try_hits} clicks worked on the first try, "
+                  f"{self.wasted_attempts} failed attempts, {len(self.selectors)} selectors learned")
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+
+class CurriculumIndex:
+    """Persisted module → day → flashcard deck tree with last-known progress per deck"""
+
+    def __init__(self, path: Optional[str] = "curriculum-index.json", max_age_hours: float = 24):
+        self.path = path
+        self.max_age_hours = max_age_hours
+        self.data: Dict = {"homepage_url": None, "crawled_at": 0, "stale": True, "modules": []}
+
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not read curriculum index {path}: {str(e)} - it will be rebuilt")
+
+    def is_stale(self, homepage_url: Optional[str], ignore_age: bool = False) -> bool:
+        """True when the index is missing, marked stale, too old or built for another homepage"""
+        if not self.data.get("modules") or self.data.get("stale"):
+            return True
+        if homepage_url and self.data.get("homepage_url") != homepage_url:
+            return True
+        if ignore_age:
+            return False
+        return time.time() - self.data.get("crawled_at", 0) > self.max_age_hours * 3600
+
+    def mark_stale(self):
+        """Force a re-crawl on the next run, e.g. after a deck URL stopped working"""
+        self.data["stale"] = True
+
+    def set_modules(self, homepage_url: Optional[str], modules: List[Dict]):
+        """Replace the tree with a fresh crawl, keeping known progress for decks that still exist"""
+        known = {deck["url"]: deck for deck in self.decks()}
+        for module in modules:
+            for day in module["days"]:
+                for deck in day["decks"]:
+                    previous = known.get(deck["url"])
+                    if previous:
+                        deck["completed"] = previous.get("completed", 0)
+                        deck["total"] = previous.get("total", 0)
+                        deck["checked_at"] = previous.get("checked_at")
+                        deck["questions"] = previous.get("questions", [])
+
+        self.data = {
+            "homepage_url": homepage_url,
+            "crawled_at": time.time(),
+            "stale": False,
+            "modules": modules
+        }
+
+    def decks(self) -> List[Dict]:
+        """All decks in page order, each annotated with its module and day"""
+        decks = []
+        for module in self.data.get("modules", []):
+            for day in module.get("days", []):
+                for deck in day.get("decks", []):
+                    decks.append({**deck, "module": module["name"], "day": day["title"]})
+        return decks
+
+    def pending_decks(self) -> List[Dict]:
+        """Decks not yet known to be complete (never checked decks count as pending)"""
+        return [
+            deck for deck in self.decks()
+            if not deck.get("total") or deck.get("completed", 0) < deck["total"]
+        ]
+
+    def update_progress(self, url: str, completed: int, total: int, questions: Optional[List[str]] = None):
+        """Record a deck's progress and, optionally, the questions seen in it for prefetching next time"""
+        for module in self.data.get("modules", []):
+            for day in module.get("days", []):
+                for deck in day.get("decks", []):
+                    if deck["url"] == url:
+                        deck["completed"] = completed
+                        deck["total"] = total
+                        deck["checked_at"] = time.time()
+                        if questions:
+                            deck["questions"] = questions
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,129 @@
+import re
+import time
+from typing import Dict, Iterator, List, Optional
+
+POLICIES = ("page", "fewest-remaining", "most-remaining")
+
+# Used until a run has exported metrics, and until this run has timed some cards itself
+DEFAULT_SECONDS_PER_CARD = 6.0
+DEFAULT_SECONDS_PER_DECK = 5.0
+
+
+def parse_duration(text: str) -> float:
+    """Seconds in a duration like "30m", "1h30m", "90s" or "45" (bare numbers are minutes)"""
+    text = text.strip().lower()
+    if re.fullmatch(r"\d+(\.\d+)?", text):
+        return float(text) * 60
+    if not re.fullmatch(r"(\d+(\.\d+)?\s*[hms]\s*)+", text):
+        raise ValueError(f"invalid duration {text!r} - use e.g. 30m, 1h30m or 90s")
+    return sum(
+        float(value) * {"h": 3600, "m": 60, "s": 1}[unit]
+        for value, unit in re.findall(r"(\d+(?:\.\d+)?)\s*([hms])", text)
+    )
+
+
+class DeckScheduler:
+    """Orders pending decks by a policy and keeps a run inside an optional wall-clock budget.
+
+    A deck's cost is estimated as seconds_per_deck plus its remaining cards times
+    seconds_per_card; decks never opened are assumed to be as large as the average known deck.
+    The per-card estimate starts from the last run's metrics and follows this run's own timings
+    once cards have been completed. With a budget, the next deck is the first in policy order
+    whose estimate still fits; when none fits, the next one is started anyway as long as a card
+    can still be done, and the deck loop stops it when the budget runs out.
+    """
+
+    def __init__(
+        self,
+        policy: str = "page",
+        time_budget: Optional[float] = None,
+        seconds_per_card: float = DEFAULT_SECONDS_PER_CARD,
+        seconds_per_deck: float = DEFAULT_SECONDS_PER_DECK
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown deck order {policy!r} - choose one of {', '.join(POLICIES)}")
+        self.policy = policy
+        self.time_budget = time_budget
+        self.seconds_per_card = seconds_per_card
+        self.seconds_per_deck = seconds_per_deck
+        self.started = time.monotonic()
+        self.average_total: Optional[float] = None
+        self.cards_timed = 0
+        self.card_seconds = 0.0
+        self.left: List[Dict] = []
+
+    def remaining_cards(self, deck: Dict) -> float:
+        if deck.get("total"):
+            return deck["total"] - deck.get("completed", 0)
+        return self.average_total or 0
+
+    def estimate(self, deck: Dict) -> float:
+        return self.seconds_per_deck + self.remaining_cards(deck) * self.seconds_per_card
+
+    def order(self, decks: List[Dict]) -> List[Dict]:
+        """Decks in the order the policy works through them (page order breaks ties)"""
+        known_totals = [deck["total"] for deck in decks if deck.get("total")]
+        self.average_total = sum(known_totals) / len(known_totals) if known_totals else None
+        if self.policy == "fewest-remaining":
+            return sorted(decks, key=self.remaining_cards)
+        if self.policy == "most-remaining":
+            return sorted(decks, key=lambda deck: -self.remaining_cards(deck))
+        return list(decks)
+
+    def start_clock(self):
+        """Start the budget now, e.g. once the login prompt is out of the way"""
+        self.started = time.monotonic()
+
+    def remaining_budget(self) -> Optional[float]:
+        if self.time_budget is None:
+            return None
+        return self.time_budget - (time.monotonic() - self.started)
+
+    def expired(self) -> bool:
+        remaining = self.remaining_budget()
+        return remaining is not None and remaining <= 0
+
+    def _pick(self, queue: List[Dict], remaining: Optional[float]) -> Optional[Dict]:
+        if remaining is None:
+            return queue[0]
+        fitting = next((deck for deck in queue if self.estimate(deck) <= remaining), None)
+        if fitting:
+            return fitting
+        if remaining >= self.seconds_per_deck + self.seconds_per_card:
+            return queue[0]
+        return None
+
+    def schedule(self, decks: List[Dict]) -> Iterator[Dict]:
+        """Yield the decks to process, already ordered by the policy, choosing each one only when
+        the previous deck is done so the choice sees the time actually left. Decks not reached
+        are left in self.left."""
+        queue = list(decks)
+        self.left = queue
+        while queue:
+            deck = self._pick(queue, self.remaining_budget())
+            if deck is None:
+                return
+            queue.remove(deck)
+            yield deck
+
+    def plan(self, decks: List[Dict], remaining: Optional[float] = None) -> List[Dict]:
+        """The decks (already ordered by the policy) a run would process with remaining seconds
+        (None: no limit) if every estimate held"""
+        queue = list(decks)
+        planned = []
+        while queue:
+            deck = self._pick(queue, remaining)
+            if deck is None:
+                break
+            queue.remove(deck)
+            planned.append(deck)
+            if remaining is not None:
+                remaining -= self.estimate(deck)
+        return planned
+
+    def record_deck(self, cards: int, card_seconds: float):
+        """Fold a finished deck's card timings into the per-card estimate"""
+        self.cards_timed += cards
+        self.card_seconds += card_seconds
+        if self.cards_timed:
+            self.seconds_per_card = self.card_seconds / self.cards_timed
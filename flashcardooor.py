@@ -1,792 +1,600 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
-from selenium.webdriver.common.action_chains import ActionChains
-import time
-import os
-import requests
+"""Command line entry point.
+
+`run` drives the browser; `plan`, `stats` and `cache` only read saved state, so selenium and
+the Anthropic SDK are imported inside `run` (and `replay`) to keep the other subcommands fast to start.
+"""
+import argparse
 import json
-from typing import List, Dict
+import os
+import re
+import sys
+import time
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
 from dotenv import load_dotenv
-from anthropic import Anthropic
-
-
-class FlashcardAutomation:
-    def __init__(self, claude_api_key: str):
-        # Chrome options for better stability
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument('--start-maximized')
-        chrome_options.add_argument('--disable-popup-blocking')
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
-        self.claude_client = Anthropic(api_key=claude_api_key)
-        
-    def wait_and_click(self, selector: str, by: By = By.CSS_SELECTOR, timeout: int = 10) -> bool:
-        """Enhanced utility method to wait for element and click it using multiple strategies"""
-        try:
-            print(f"Attempting to find element: {selector}")
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, selector))
-            )
-            
-            print("Scrolling element into view...")
-            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-            time.sleep(1)  
-            
-            try:
-                print("Attempting standard click...")
-                element.click()
-                return True
-            except Exception as e1:
-                print(f"Standard click failed: {str(e1)}")
-                
-                try:
-                    print("Attempting JavaScript click...")
-                    self.driver.execute_script("arguments[0].click();", element)
-                    return True
-                except Exception as e2:
-                    print(f"JavaScript click failed: {str(e2)}")
-                    
-                    try:
-                        print("Attempting Actions chain click...")
-                        actions = ActionChains(self.driver)
-                        actions.move_to_element(element).click().perform()
-                        return True
-                    except Exception as e3:
-                        print(f"Actions chain click failed: {str(e3)}")
-                        
-                        try:
-                            print("Attempting href navigation...")
-                            href = element.get_attribute('href')
-                            if href:
-                                self.driver.get(href)
-                                return True
-                        except Exception as e4:
-                            print(f"Href navigation failed: {str(e4)}")
-            
-            return False
-            
-        except Exception as e:
-            print(f"Error finding/clicking element '{selector}': {str(e)}")
-            return False
-
-    def expand_subcategory(self, subcategory_element) -> bool:
-        """Expand subcategory and check for flashcards"""
-        try:
-            print(f"Attempting to expand subcategory...")
-            
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", subcategory_element)
-            time.sleep(0.5)
-            
-            subcategory_element.click()
-            time.sleep(1)
-            
-            flashcards = self.driver.find_elements(
-                By.CSS_SELECTOR, 
-                "a.exercise.nav-flashcards"
-            )
-            
-            if flashcards:
-                print(f"Found {len(flashcards)} flashcard links")
-                return True
-            else:
-                print("No flashcard links found")
-                return False
-            
-        except Exception as e:
-            print(f"Error expanding subcategory: {str(e)}")
-            return False
-        
-    def navigate_to_flashcards(self) -> bool:
-        """Navigate to flashcards section with improved link finding"""
-        try:
-            print("Looking for flashcard link...")
-            
-            link = self.find_flashcard_link()
-            if not link:
-                print("No flashcard link found")
-                return False
-            
-            success = self.driver.execute_script('''
-                const links = document.querySelectorAll('a.exercise.nav-flashcards');
-                for (const link of links) {
-                    if (link.href === arguments[0]) {
-                        link.click();
-                        return true;
-                    }
-                }
-                return false;
-            ''', link)
-            
-            if success:
-                print("Successfully clicked flashcard link")
-                time.sleep(2) 
-                return True
-                
-            print("Click failed, trying direct navigation...")
-            self.driver.get(link)
-            time.sleep(2)
-            
-            return True
-            
-        except Exception as e:
-            print(f"Error navigating to flashcards: {str(e)}")
-            self.driver.save_screenshot("flashcard-navigation-error.png")
-            return False
-
-
-    def get_flashcard_progress(self) -> tuple[int, int]:
-        """Get current progress with comprehensive message detection including completion"""
-        try:
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "#flashcards-container"))
-            )
-            
-            stats = self.driver.execute_script('''
-                // Get the stats message container
-                const statsContainer = document.querySelector("#flashcards-container > div > div:nth-child(2) > div > div > div.deck-stats-message > div");
-                if (!statsContainer) return null;
-                
-                const text = statsContainer.textContent.trim();
-                
-                // Check for different message formats
-                if (text.includes("have mastered all")) {
-                    // Format: "You have mastered all X cards in this deck!"
-                    const match = text.match(/mastered all (\d+)/);
-                    if (match) {
-                        const total = parseInt(match[1]);
-                        return {
-                            completed: total,
-                            total: total,
-                            needsWork: false,
-                            isComplete: true
-                        };
-                    }
-                } else if (text.includes("still need to master all")) {
-                    // Format: "You still need to master all X cards in this deck"
-                    const match = text.match(/still need to master all (\d+)/);
-                    if (match) {
-                        const total = parseInt(match[1]);
-                        return {
-                            completed: 0,
-                            total: total,
-                            needsWork: true,
-                            isComplete: false
-                        };
-                    }
-                } else if (text.includes("have mastered")) {
-                    // Format: "You have mastered X out of Y cards in this deck"
-                    const match = text.match(/mastered (\d+) out of (\d+)/);
-                    if (match) {
-                        const completed = parseInt(match[1]);
-                        const total = parseInt(match[2]);
-                        return {
-                            completed: completed,
-                            total: total,
-                            needsWork: completed < total,
-                            isComplete: completed === total
-                        };
-                    }
-                }
-                
-                return null;
-            ''')
-            
-            if not stats:
-                print("Could not parse flashcard progress message")
-                return (0, 0)
-                
-            if stats.get('isComplete'):
-                print(f"✨ All {stats['total']} cards mastered! ✨")
-            else:
-                print(f"Progress: {stats['completed']}/{stats['total']} cards completed")
-                if stats['needsWork']:
-                    print(f"Remaining: {stats['total'] - stats['completed']} cards to master")
-            
-            return (stats['completed'], stats['total'])
-            
-        except Exception as e:
-            print(f"Error getting flashcard progress: {str(e)}")
-            
-            timestamp = time.strftime("%Y%m%d-%H%M%S")
-            self.driver.save_screenshot(f"progress-error-{timestamp}.png")
-            
-            try:
-                with open(f"page-source-{timestamp}.html", "w") as f:
-                    f.write(self.driver.page_source)
-            except:
-                pass
-                
-            return (0, 0)
-
-    def process_flashcards_section(self):
-        """Process flashcards with improved completion detection"""
-        try:
-            print("\nProcessing flashcard section...")
-            
-            if not self.navigate_to_flashcards():
-                print("Failed to navigate to flashcards")
-                return
-                
-            time.sleep(3)
-            
-            completed, total = self.get_flashcard_progress()
-            
-            if total == 0:
-                print("Could not determine total flashcards")
-                return
-                
-            if completed == total:
-                print(f"✨ Section complete! All {total} cards mastered ✨")
-                return
-                
-            remaining = total - completed
-            print(f"\nProcessing {remaining} remaining flashcards")
-            
-            cards_processed = 0
-            consecutive_errors = 0
-            max_errors = 3
-            
-            while cards_processed < remaining:
-                current_completed, _ = self.get_flashcard_progress()
-                if current_completed == total:
-                    print(f"✨ All cards completed! ✨")
-                    break
-                    
-                success = self.handle_flashcard()
-                if success:
-                    cards_processed += 1
-                    consecutive_errors = 0
-                    print(f"\nProgress: {cards_processed}/{remaining} remaining cards completed")
-                    print(f"Overall: {completed + cards_processed}/{total}")
-                else:
-                    consecutive_errors += 1
-                    if consecutive_errors >= max_errors:
-                        print(f"\nToo many consecutive errors ({max_errors}) - stopping")
-                        break
-                        
-                time.sleep(1)
-                
-            final_completed, final_total = self.get_flashcard_progress()
-            if final_completed == final_total:
-                print(f"\n✨ Section successfully completed! All {final_total} cards mastered ✨")
-            else:
-                print(f"\nFinal progress: {final_completed}/{final_total}")
-                if final_completed < final_total:
-                    print(f"Note: {final_total - final_completed} cards still need work")
-            
-        except Exception as e:
-            print(f"Error processing flashcards: {str(e)}")
-            self.driver.save_screenshot("section-error.png")
-        finally:
-            print("Finished processing section")
-
-    def get_total_flashcards(self) -> int:
-        """Get total number of flashcards in current section"""
-        try:
-            self.wait.until(EC.presence_of_element_located((By.CLASS_NAME, "deck-stats-message")))
-            
-            total_cards = self.driver.execute_script('''
-                const statsText = document.querySelector("div[data-flashcards-mastering-target='deckStatsMessage'] p").textContent;
-                const match = statsText.match(/out of (\\d+) cards/);
-                return match ? parseInt(match[1]) : 0;
-            ''')
-            
-            if total_cards:
-                print(f"Found {total_cards} total flashcards in this section")
-                return total_cards
-            
-            stats_element = self.driver.find_element(By.CSS_SELECTOR, 
-                "div[data-flashcards-mastering-target='deckStatsMessage'] strong")
-            if stats_element:
-                text = stats_element.text
-                try:
-                    number = int(text)
-                    print(f"Found {number} total flashcards using fallback method")
-                    return number
-                except ValueError:
-                    print(f"Could not parse number from text: {text}")
-                    
-            print("Could not determine total number of flashcards")
-            return 0
-            
-        except Exception as e:
-            print(f"Error getting total flashcards: {str(e)}")
-            self.driver.save_screenshot("flashcard-count-error.png")
-            return 0
-
-    def handle_flashcard(self) -> bool:
-        """Process a single flashcard with simplified state detection"""
-        try:
-            print("\nProcessing flashcard...")
-            
-            WebDriverWait(self.driver, 5).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".flashcard-game-card-content"))
-            )
-            
-            is_flipped = self.driver.execute_script('''
-                const knewItButton = document.querySelector("#played-card-submit-know");
-                return Boolean(knewItButton && 
-                            window.getComputedStyle(knewItButton).display !== 'none' &&
-                            window.getComputedStyle(knewItButton).visibility !== 'hidden');
-            ''')
-            
-            if is_flipped:
-                print("Card is already flipped, moving to next...")
-                self.driver.execute_script('''
-                    const button = document.querySelector("#played-card-submit-know");
-                    if (button) button.click();
-                ''')
-                time.sleep(2)
-                return True
-            
-            question = self.driver.execute_script('''
-                const questionElement = document.querySelector(".flashcard-game-card-content-markdown p");
-                return questionElement ? questionElement.textContent : null;
-            ''')
-            
-            if not question:
-                print("No question found")
-                return False
-                
-            print(f"Found question: {question}")
-            
-            flip_button_exists = self.driver.execute_script('''
-                const flipButton = document.querySelector("#flashcard > div > div.flashcard-game-card-front > div > div.flashcard-game-card-content > button");
-                return Boolean(flipButton && 
-                            window.getComputedStyle(flipButton).display !== 'none' &&
-                            window.getComputedStyle(flipButton).visibility !== 'hidden');
-            ''')
-            
-            if not flip_button_exists:
-                print("Flip button not found or not visible")
-                return False
-            
-            answer = self.get_claude_response(question)
-            
-            success = self.driver.execute_script('''
-                const textarea = document.querySelector('#user-guess-text-area');
-                if (textarea) {
-                    textarea.value = arguments[0];
-                    return true;
-                }
-                return false;
-            ''', answer)
-            
-            if not success:
-                print("Failed to enter answer")
-                return False
-                
-            print("Entered answer, flipping card...")
-            
-            flip_success = self.driver.execute_script('''
-                const flipButton = document.querySelector("#flashcard > div > div.flashcard-game-card-front > div > div.flashcard-game-card-content > button");
-                if (flipButton) {
-                    flipButton.click();
-                    return true;
-                }
-                return false;
-            ''')
-            
-            if not flip_success:
-                print("Failed to click flip button")
-                return False
-                
-            print("Flipped card, waiting for animation...")
-            time.sleep(1)
-            
-            knew_it_success = self.driver.execute_script('''
-                let attempts = 0;
-                const maxAttempts = 10;
-                const checkAndClick = () => {
-                    const button = document.querySelector("#played-card-submit-know");
-                    if (button && 
-                        window.getComputedStyle(button).display !== 'none' &&
-                        window.getComputedStyle(button).visibility !== 'hidden') {
-                        button.click();
-                        return true;
-                    }
-                    return false;
-                };
-                
-                // Try multiple times to find and click the button
-                while (attempts < maxAttempts) {
-                    if (checkAndClick()) return true;
-                    attempts++;
-                }
-                return false;
-            ''')
-            
-            if not knew_it_success:
-                print("Failed to click 'I knew it' button")
-                return False
-                
-            print("Successfully completed flashcard")
-            time.sleep(2) 
-            return True
-            
-        except Exception as e:
-            print(f"Error handling flashcard: {str(e)}")
-            self.driver.save_screenshot(f"flashcard-error-{time.strftime('%Y%m%d-%H%M%S')}.png")
-            return False
-              
-    def start(self, homepage_url: str):
-        """Start automation from homepage"""
-        self.driver.get(homepage_url)
-        time.sleep(3)  
-        
-    def find_all_modules(self) -> List[Dict]:
-        """Find all main module categories"""
-        modules = []
-        module_elements = self.driver.find_elements(By.CSS_SELECTOR, ".module-header")
-        
-        for element in module_elements:
-            try:
-                name = element.find_element(By.CSS_SELECTOR, ".module-header-name").text
-                href = element.get_attribute("href")
-                modules.append({
-                    "name": name,
-                    "href": href,
-                    "element": element
-                })
-            except NoSuchElementException:
-                continue
-                
-        return modules
-    
-    def expand_module(self, module_element) -> List[Dict]:
-        """Click on module and find all subcategories"""
-        module_element.click()
-        time.sleep(1)
-        
-        subcategories = []
-        day_elements = self.driver.find_elements(By.CSS_SELECTOR, ".day")
-        
-        for day in day_elements:
-            try:
-                title = day.find_element(By.CSS_SELECTOR, "div").text
-                subcategories.append({
-                    "title": title,
-                    "element": day
-                })
-            except NoSuchElementException:
-                continue
-                
-        return subcategories
-    
-    def get_claude_response(self, question: str) -> str:
-        """Get response from Claude API using official client"""
-        try:
-            response = self.claude_client.messages.create(
-                model="claude-3-5-haiku-20241022",
-                max_tokens=1024,
-                messages=[
-                    {"role": "user", "content": question}
-                ]
-            )
-            return response.content[0].text
-            
-        except Exception as e:
-            print(f"Error calling Claude API: {str(e)}")
-            return "Error connecting to Claude API"
-    
-    def find_all_modules(self) -> List[Dict]:
-        """Find all main module categories using improved JavaScript"""
-        try:
-            print("Searching for modules...")
-            
-            modules = self.driver.execute_script('''
-                const moduleElements = document.querySelectorAll(".modules-nav > a");
-                return Array.from(moduleElements).map(element => {
-                    // Get the name from the module-header-name element
-                    const nameElement = element.querySelector(".module-header-name");
-                    const name = nameElement ? nameElement.textContent.trim() : "";
-                    
-                    // Get the href attribute
-                    const href = element.href;
-                    
-                    // Get data attributes that might be useful for navigation
-                    const path = element.getAttribute("href");
-                    
-                    // Debug info
-                    console.log("Found module:", {
-                        name: name,
-                        href: href,
-                        path: path
-                    });
-                    
-                    return {
-                        name: name || "Unknown",
-                        href: href || "",
-                        path: path || "",
-                        isActive: element.classList.contains("active")
-                    };
-                }).filter(module => module.href); // Only return modules with valid hrefs
-            ''')
-            
-            if not modules:
-                print("No modules found - trying alternative selector...")
-                modules = self.driver.execute_script('''
-                    const moduleElements = document.querySelectorAll("[data-original-title]");
-                    return Array.from(moduleElements).map(element => ({
-                        name: element.getAttribute("data-original-title") || "Unknown",
-                        href: element.href,
-                        path: element.getAttribute("href"),
-                        isActive: element.classList.contains("active")
-                    })).filter(module => module.href);
-                ''')
-            
-            print(f"\nFound {len(modules)} modules:")
-            for module in modules:
-                print(f"- {module['name']} ({module['path']})")
-                
-            return modules
-        except Exception as e:
-            print(f"Error finding modules: {str(e)}")
-            self.driver.save_screenshot("module-detection-error.png")
-            return []
-
-    def get_subcategories(self) -> List[Dict]:
-        """Get all subcategories with improved flashcard detection"""
-        try:
-            print("\nFinding subcategories...")
-            
-            subcategories = self.driver.execute_script('''
-                const subcategoryElements = Array.from(
-                    document.querySelectorAll("#days-nav > div.days-nav > div > div.day")
-                );
-                
-                return subcategoryElements.map((element, index) => {
-                    const titleElement = element.querySelector("div");
-                    const title = titleElement ? titleElement.textContent.trim() : "Unknown";
-                    
-                    // Check next sibling for flashcards
-                    const exercisesContainer = element.nextElementSibling;
-                    const hasFlashcards = exercisesContainer && 
-                                        exercisesContainer.querySelector("a.exercise.nav-flashcards");
-                    
-                    return {
-                        title: title,
-                        index: index + 1,
-                        selector: `#days-nav > div.days-nav > div > div:nth-child(${2 * index + 1})`,
-                        hasFlashcards: Boolean(hasFlashcards)
-                    };
-                });
-            ''')
-            
-            if subcategories:
-                print(f"\nFound {len(subcategories)} subcategories:")
-                for subcat in subcategories:
-                    print(f"- {subcat['title']} {'(has flashcards)' if subcat['hasFlashcards'] else ''}")
-            else:
-                print("No subcategories found")
-                
-            return subcategories
-            
-        except Exception as e:
-            print(f"Error finding subcategories: {str(e)}")
-            self.driver.save_screenshot("subcategory-error.png")
-            return []
-
-    def navigate_to_module(self, module: Dict) -> bool:
-        """Navigate to a specific module with improved error handling"""
-        try:
-            if not module.get('path') and not module.get('href'):
-                print("No valid navigation path found for module")
-                return False
-                
-            print(f"\nNavigating to module: {module['name']}")
-            
-            try:
-                element = self.driver.execute_script(f'''
-                    return document.querySelector(`a[href="{module['path']}"]`) ||
-                        document.querySelector(`a[href="{module['href']}"]`);
-                ''')
-                
-                if element:
-                    print("Found module element, attempting to click...")
-                    self.driver.execute_script("arguments[0].click();", element)
-                    time.sleep(2)
-                    return True
-            except Exception as click_error:
-                print(f"Click navigation failed: {click_error}")
-            
-            print("Attempting direct navigation...")
-            navigation_url = module.get('href') or module.get('path')
-            if navigation_url:
-                if not navigation_url.startswith('http'):
-                    base_url = self.driver.current_url.split('?')[0]
-                    navigation_url = f"{base_url}{navigation_url}"
-                
-                print(f"Navigating to: {navigation_url}")
-                self.driver.get(navigation_url)
-                time.sleep(2)
-                return True
-                
-            print("All navigation attempts failed")
-            return False
-            
-        except Exception as e:
-            print(f"Error navigating to module: {str(e)}")
-            self.driver.save_screenshot("navigation-error.png")
-            return False
-
-
-    def expand_subcategory(self, subcategory: Dict) -> bool:
-        """Expand a specific subcategory using JavaScript"""
-        try:
-            print(f"\nExpanding subcategory: {subcategory['title']}")
-            
-            success = self.driver.execute_script('''
-                const element = document.querySelector(arguments[0]);
-                if (!element) return false;
-                
-                // First scroll into view
-                element.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                
-                // Check if it's already expanded
-                const nextElement = element.nextElementSibling;
-                const isExpanded = nextElement && 
-                                nextElement.classList.contains('exercises') && 
-                                !nextElement.classList.contains('no-height');
-                                
-                if (!isExpanded) {
-                    // Click to expand if not already expanded
-                    element.click();
-                }
-                
-                return true;
-            ''', subcategory['selector'])
-            
-            if success:
-                print("Successfully expanded subcategory")
-                time.sleep(2)  
-                return True
-            else:
-                print("Failed to find subcategory element")
-                return False
-                
-        except Exception as e:
-            print(f"Error expanding subcategory: {str(e)}")
-            self.driver.save_screenshot("subcategory-expansion-error.png")
-            return False
-
-        
-    def find_flashcard_link(self) -> str:
-        """Find the flashcard link in the current subcategory with path preservation"""
-        try:
-            link = self.driver.execute_script('''
-                // Find all exercise containers that are currently visible
-                const exerciseContainers = document.querySelectorAll('.exercises:not(.no-height)');
-                
-                // Get the most recently expanded container
-                const container = exerciseContainers[exerciseContainers.length - 1];
-                if (!container) return null;
-                
-                const flashcardLink = container.querySelector('a.exercise.nav-flashcards');
-                return flashcardLink ? flashcardLink.href : null;
-            ''')
-            
-            if link:
-                print(f"Found flashcard link: {link}")
-                return link
-            
-            print("No flashcard link found")
-            return None
-            
-        except Exception as e:
-            print(f"Error finding flashcard link: {str(e)}")
-            return None
-        
-    def process_all_content(self):
-        """Main method to process all flashcards with improved subcategory handling"""
-        try:
-            modules = self.find_all_modules()
-            
-            if not modules:
-                print("No modules found")
-                self.driver.save_screenshot("no-modules-found.png")
-                return
-            
-            for module in modules:
-                print(f"\n{'='*20}")
-                print(f"Processing module: {module['name']}")
-                print(f"{'='*20}")
-                
-                if not self.navigate_to_module(module):
-                    print(f"Skipping module {module['name']} due to navigation error")
-                    continue
-                
-                time.sleep(2)
-                
-                subcategories = self.get_subcategories()
-                
-                if not subcategories:
-                    print("No subcategories found in this module")
-                    continue
-                
-                for subcategory in subcategories:
-                    print(f"\n{'-'*20}")
-                    print(f"Checking subcategory: {subcategory['title']}")
-                    
-                    if not subcategory.get('hasFlashcards'):
-                        print("No flashcards in this subcategory - skipping")
-                        continue
-                    
-                    if not self.expand_subcategory(subcategory):
-                        print("Failed to expand subcategory - skipping")
-                        continue
-                    
-                    print("Processing flashcards...")
-                    self.process_flashcards_section()
-                    
-                    print("Returning to module page...")
-                    if not self.navigate_to_module(module):
-                        print("Failed to return to module page - breaking")
-                        break
-                
-                print(f"\nCompleted module: {module['name']}")
-                
-        except Exception as e:
-            print(f"Critical error in process_all_content: {str(e)}")
-            self.driver.save_screenshot("critical-error.png")
-
-    def cleanup(self):
-        """Close the browser"""
-        self.driver.quit()
 
-def main():
+from answer_cache import AnswerCache
+from curriculum_index import CurriculumIndex
+from deck_scheduler import DEFAULT_SECONDS_PER_CARD, DEFAULT_SECONDS_PER_DECK, POLICIES, DeckScheduler, parse_duration
+from run_ledger import RunLedger
+
+COMMANDS = ("run", "plan", "stats", "cache", "replay", "compare")
+
+
+def add_profile_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile",
+        metavar="PREFIX",
+        help="Time every WebDriver command by call site and profile the Python side; writes "
+             "PREFIX-webdriver.txt, PREFIX.prof and PREFIX.collapsed (default prefix: profile)"
+    )
+
+
+def add_homepage_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "homepages",
+        nargs="*",
+        metavar="URL_OR_PATH",
+        help="Camp paths to process in one session: homepage URLs, or path names applied to "
+             "HOMEPAGE_URL (default: HOMEPAGE_URL, which may list several separated by commas)"
+    )
+
+
+def add_schedule_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--order",
+        choices=POLICIES,
+        default=os.getenv("DECK_ORDER", "page"),
+        help="Order pending decks by page position or by cards left (default: DECK_ORDER or page)"
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=parse_duration,
+        default=os.getenv("TIME_BUDGET"),
+        metavar="DURATION",
+        help="Stop cleanly after this long, e.g. 30m or 1h30m (default: TIME_BUDGET, or no limit)"
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    # The option defaults come from the environment, so .env has to be loaded first
     load_dotenv()
-    
+    # No subcommand (or only run options) means `run`, as before subcommands existed
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv = ["run"] + argv
+
+    parser = argparse.ArgumentParser(description="Complete Le Wagon flashcards with Claude")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Open the browser and work through pending decks (default)")
+    run_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip decks the run ledger marks complete and continue the interrupted deck first"
+    )
+    run_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream answers into the card as Claude writes them (same as ANSWER_STREAM=1)"
+    )
+    run_parser.add_argument(
+        "--record",
+        metavar="TRACE",
+        help="Record every WebDriver command, Claude request, HTTP fetch and sleep to a gzipped trace file"
+    )
+    add_schedule_arguments(run_parser)
+    add_homepage_argument(run_parser)
+    add_profile_argument(run_parser)
+
+    plan_parser = subparsers.add_parser("plan", help="List pending decks and the expected runtime, without a browser")
+    plan_parser.add_argument("--resume", action="store_true", help="Plan as `run --resume` would")
+    add_schedule_arguments(plan_parser)
+    add_homepage_argument(plan_parser)
+
+    subparsers.add_parser("stats", help="Summarize saved progress, the run ledger and the last run's metrics")
+
+    cache_parser = subparsers.add_parser("cache", help="Inspect or maintain the answer cache")
+    cache_action = cache_parser.add_mutually_exclusive_group()
+    cache_action.add_argument("--prune", action="store_true", help="Remove expired and over-limit entries")
+    cache_action.add_argument("--clear", action="store_true", help="Remove every cached answer")
+
+    replay_parser = subparsers.add_parser(
+        "replay", help="Re-drive a recorded trace against its recorded responses, without a browser or network"
+    )
+    replay_parser.add_argument("trace", help="Trace written by `run --record`")
+    replay_parser.add_argument("--record", metavar="TRACE", help="Write the replayed run's own trace, for `compare`")
+    add_profile_argument(replay_parser)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare round trips, sleeps and API calls per deck between two traces"
+    )
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+
+    return parser.parse_args(argv)
+
+
+def open_answer_cache() -> AnswerCache:
+    cache_ttl_hours = os.getenv("ANSWER_CACHE_TTL_HOURS")
+    return AnswerCache(
+        path=os.getenv("ANSWER_CACHE_PATH", "answer-cache.sqlite3"),
+        max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000")),
+        ttl_seconds=float(cache_ttl_hours) * 3600 if cache_ttl_hours else None
+    )
+
+
+def open_curriculum_index(path: Optional[str] = None) -> CurriculumIndex:
+    return CurriculumIndex(
+        path=path or os.getenv("CURRICULUM_INDEX_PATH", "curriculum-index.json"),
+        max_age_hours=float(os.getenv("CURRICULUM_INDEX_MAX_AGE_HOURS", "24"))
+    )
+
+
+def with_path(url: str, path: str) -> str:
+    """url with its Kitt `path` query parameter set to path"""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query["path"] = path
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def homepage_urls(values: Optional[List[str]] = None) -> List[str]:
+    """Homepages to process, from the command line or HOMEPAGE_URL (comma or space separated).
+    Values that are not URLs are path names, applied to the first URL given or to HOMEPAGE_URL."""
+    configured = [url for url in re.split(r"[,\s]+", os.getenv("HOMEPAGE_URL", "")) if url]
+    values = [value for value in (values or configured) if value]
+    base = next((value for value in values + configured if value.startswith("http")), None)
+    urls = []
+    for value in values:
+        if value.startswith("http"):
+            urls.append(value)
+        elif base:
+            urls.append(with_path(base, value))
+        else:
+            raise ValueError(f"{value!r} is a path name, but there is no homepage URL to apply it to")
+    return list(dict.fromkeys(urls))
+
+
+def homepage_urls_or_exit(values: Optional[List[str]] = None) -> List[str]:
+    """homepage_urls for a command, exiting with the error when a path name has no URL to apply to"""
+    try:
+        return homepage_urls(values)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+
+def index_path_for(homepage_url: str) -> str:
+    """A curriculum index file per camp and path, next to CURRICULUM_INDEX_PATH"""
+    parts = urlsplit(homepage_url)
+    camp = re.search(r"/camps/([^/]+)", parts.path)
+    path = dict(parse_qsl(parts.query)).get("path")
+    # Without the usual /camps/<id>/...?path=<name> shape, the whole URL path tells homepages apart
+    name = "-".join(filter(None, [camp.group(1) if camp else parts.path, path]))
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-").lower() or "home"
+    base, extension = os.path.splitext(os.getenv("CURRICULUM_INDEX_PATH", "curriculum-index.json"))
+    return f"{base}.{slug}{extension}"
+
+
+def curriculum_indexes(urls: List[str]) -> List[Tuple[Optional[str], CurriculumIndex]]:
+    """(homepage, index) per camp path. A single path keeps using CURRICULUM_INDEX_PATH itself."""
+    if len(urls) <= 1:
+        return [(urls[0] if urls else None, open_curriculum_index())]
+    return [(url, open_curriculum_index(index_path_for(url))) for url in urls]
+
+
+def load_last_metrics() -> Optional[Dict]:
+    """The JSON metrics export of the last run, if there is one"""
+    path = os.getenv("METRICS_PATH", "run-metrics.json")
+    if path.endswith(".prom") or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def runtime_estimates(metrics: Optional[Dict]) -> tuple[float, float, str]:
+    """Seconds per card and per-deck overhead from the last run's metrics, with their source"""
+    if not metrics:
+        return DEFAULT_SECONDS_PER_CARD, DEFAULT_SECONDS_PER_DECK, "defaults - no metrics from an earlier run"
+
+    counters = metrics.get("counters", {})
+    phases = metrics.get("phases", {})
+    per_card = DEFAULT_SECONDS_PER_CARD
+    if counters.get("cards_completed"):
+        per_card = counters["card_seconds"] / counters["cards_completed"]
+    per_deck = DEFAULT_SECONDS_PER_DECK
+    deck = phases.get("deck")
+    if deck and deck["count"]:
+        per_deck = max(deck["total"] - counters.get("card_seconds", 0), 0) / deck["count"]
+    return per_card, per_deck, os.getenv("METRICS_PATH", "run-metrics.json")
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def describe_index(index: CurriculumIndex, homepage_url: Optional[str]) -> Optional[str]:
+    if not index.data.get("modules"):
+        return None
+    crawled_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(index.data["crawled_at"]))
+    freshness = "stale - `run` will re-crawl" if index.is_stale(homepage_url) else "fresh"
+    return f"Curriculum index from {crawled_at} ({freshness})"
+
+
+def plan_command(args):
+    per_card, per_deck, source = runtime_estimates(load_last_metrics())
+    scheduler = DeckScheduler(args.order, args.time_budget, per_card, per_deck)
+    ledger_path = os.getenv("RUN_LEDGER_PATH", "run-ledger.jsonl")
+    ledger = RunLedger(ledger_path) if args.resume and os.path.exists(ledger_path) else None
+    paths = curriculum_indexes(homepage_urls_or_exit(args.homepages))
+    remaining = scheduler.remaining_budget()
+    total_cards = 0.0
+    total_seconds = 0.0
+    pending_count = 0
+    planned_count = 0
+
+    for homepage_url, index in paths:
+        if len(paths) > 1:
+            print(f"\nPath: {homepage_url}")
+        description = describe_index(index, homepage_url)
+        if not description:
+            print("No curriculum index yet - `run` will crawl every module first")
+            continue
+        print(description)
+
+        pending = scheduler.order(index.pending_decks())
+        if ledger:
+            pending = ledger.resume_order(pending)
+        planned = scheduler.plan(pending, remaining)
+        pending_count += len(pending)
+        planned_count += len(planned)
+
+        print(f"\n{len(pending)} of {len(index.decks())} decks pending ({args.order} order)\n")
+        print(f"{'Deck':<52}{'Cards left':>11}{'Est.':>9}")
+        for deck in planned:
+            cards = scheduler.remaining_cards(deck)
+            if deck.get("total"):
+                cards_text = str(cards)
+            else:
+                # Never opened: assume the average deck size seen so far
+                cards_text = f"~{cards:.0f}" if scheduler.average_total else "?"
+            seconds = scheduler.estimate(deck)
+            total_cards += cards
+            total_seconds += seconds
+            if remaining is not None:
+                remaining -= seconds
+            print(f"{(deck['module'] + ' / ' + deck['day'])[:50]:<52}{cards_text:>11}{format_duration(seconds):>9}")
+
+    if not pending_count and not planned_count:
+        return
+    print(f"\nAbout {total_cards:.0f} cards, {format_duration(total_seconds)} "
+          f"at {per_card:.1f}s per card + {per_deck:.1f}s per deck ({source})")
+    if planned_count < pending_count:
+        print(f"{pending_count - planned_count} decks don't fit in the {format_duration(args.time_budget)} budget")
+
+
+def describe_progress(index: CurriculumIndex, homepage_url: Optional[str]):
+    description = describe_index(index, homepage_url)
+    if not description:
+        print("No curriculum index yet")
+        return
+    decks = index.decks()
+    checked = [deck for deck in decks if deck.get("total")]
+    complete = [deck for deck in checked if deck.get("completed", 0) >= deck["total"]]
+    print(description)
+    print(f"Decks: {len(decks)} total, {len(complete)} complete, {len(decks) - len(complete)} pending "
+          f"({len(decks) - len(checked)} never opened)")
+    print(f"Cards mastered in checked decks: {sum(deck.get('completed', 0) for deck in checked)}"
+          f"/{sum(deck['total'] for deck in checked)}")
+    for module, module_decks in groupby(decks, key=lambda deck: deck["module"]):
+        module_decks = list(module_decks)
+        done = sum(1 for deck in module_decks if deck.get("total") and deck.get("completed", 0) >= deck["total"])
+        print(f"  {module}: {done}/{len(module_decks)} decks complete")
+
+
+def stats_command(args):
+    paths = curriculum_indexes(homepage_urls_or_exit())
+    for homepage_url, index in paths:
+        if len(paths) > 1:
+            print(f"\nPath: {homepage_url}")
+        describe_progress(index, homepage_url)
+
+    ledger_path = os.getenv("RUN_LEDGER_PATH", "run-ledger.jsonl")
+    if os.path.exists(ledger_path):
+        ledger = RunLedger(ledger_path)
+        entries = ledger.entries()
+        if entries:
+            last_run = entries[-1]["run_id"]
+            cards = sum(1 for entry in entries if entry["run_id"] == last_run and entry["event"] == "card")
+            runs = len({entry["run_id"] for entry in entries})
+            print(f"\nRun ledger: {runs} runs, last run {last_run} mastered {cards} cards")
+            interrupted = ledger.interrupted_deck()
+            if interrupted:
+                print(f"Interrupted deck (continued first by `run --resume`): {interrupted}")
+
+    metrics = load_last_metrics()
+    if metrics:
+        counters = metrics.get("counters", {})
+        finished_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(metrics.get("finished_at", 0)))
+        print(f"\nLast run metrics ({finished_at}):")
+        if counters.get("card_seconds"):
+            print(f"  {counters.get('cards_completed', 0):.0f} cards, "
+                  f"{counters['cards_completed'] / counters['card_seconds'] * 60:.1f} cards/min")
+        phases = sorted(metrics.get("phases", {}).items(), key=lambda item: -item[1]["total"])
+        for name, phase in phases[:8]:
+            print(f"  {name:<24}{phase['count']:>6}x  p50 {phase['p50']:.2f}s  p95 {phase['p95']:.2f}s")
+
+    cache_path = os.getenv("ANSWER_CACHE_PATH", "answer-cache.sqlite3")
+    if os.path.exists(cache_path):
+        cache = open_answer_cache()
+        print(f"\nAnswer cache: {len(cache)} answers")
+        cache.close()
+
+
+def cache_command(args):
+    cache_path = os.getenv("ANSWER_CACHE_PATH", "answer-cache.sqlite3")
+    if not os.path.exists(cache_path):
+        print(f"No answer cache at {cache_path}")
+        return
+
+    cache = open_answer_cache()
+    try:
+        if args.clear:
+            print(f"Removed {cache.clear()} cached answers")
+        elif args.prune:
+            print(f"Removed {cache.prune()} expired or over-limit answers")
+
+        print(f"Answer cache {cache_path}: {len(cache)} answers, {os.path.getsize(cache_path) / 1024:.0f} KiB")
+        for model, count in sorted(cache.model_counts().items()):
+            print(f"  {model}: {count}")
+    finally:
+        cache.close()
+
+
+def run_settings(args) -> Dict:
+    """FlashcardAutomation options that shape the run's control flow; a recorded trace keeps them for replay"""
+    return {
+        "prefetch_workers": int(os.getenv("ANSWER_PREFETCH_WORKERS", "4")),
+        "batch_size": int(os.getenv("ANSWER_BATCH_SIZE", "8")),
+        "progress_verify_every": int(os.getenv("PROGRESS_VERIFY_EVERY", "10")),
+        "stream_answers": args.stream or os.getenv("ANSWER_STREAM", "0") == "1",
+        "answer_max_chars": int(os.getenv("ANSWER_MAX_CHARS", "600")) or None,
+        "answer_max_sentences": int(os.getenv("ANSWER_MAX_SENTENCES", "4")) or None,
+        "stream_update_interval": float(os.getenv("ANSWER_STREAM_UPDATE_SECONDS", "0.5")),
+    }
+
+
+def run_command(args):
+    # Heavy imports (selenium, anthropic) are only paid for by the subcommand that needs them
+    from artifacts import ArtifactWriter
+    from automation import CLAUDE_MODEL, FlashcardAutomation
+    from browser import BrowserManager
+    from click_strategies import ClickStrategyCache
+    from fuzzy_index import FuzzyQuestionIndex
+    from http_crawler import HttpCrawler
+    from memory_watchdog import MemoryWatchdog
+    from llm_client import LLMClient
+    from metrics import Metrics
+    from model_router import ModelRouter
+    from profiler import RunProfiler
+    from run_trace import TraceRecorder
+
     claude_api_key = os.getenv("CLAUDE_API_KEY")
     if not claude_api_key:
         print("ERROR: CLAUDE_API_KEY not found in environment variables")
         print("Please create a .env file with your API key like: CLAUDE_API_KEY=your_key_here")
         return
-        
+
     if not claude_api_key.startswith("sk-"):
         print("WARNING: API key format looks incorrect (should start with 'sk-')")
-    
-    homepage_url = os.getenv("HOMEPAGE_URL")
-    if not homepage_url:
+
+    homepages = homepage_urls_or_exit(args.homepages)
+    if not homepages:
         print("ERROR: HOMEPAGE_URL not found in environment variables")
         print("Please create a .env file with your URL like: HOMEPAGE_URL=https://kitt.lewagon.com/camps/your_camp_id/challenges?path=your_path_here")
         return
-    
-    bot = FlashcardAutomation(claude_api_key)
+
+    answer_cache = open_answer_cache()
+
+    llm_client = LLMClient(
+        api_key=claude_api_key,
+        model=CLAUDE_MODEL,
+        requests_per_minute=float(os.getenv("CLAUDE_REQUESTS_PER_MINUTE", "50")),
+        tokens_per_minute=float(os.getenv("CLAUDE_TOKENS_PER_MINUTE", "50000")),
+        max_concurrency=int(os.getenv("CLAUDE_MAX_CONCURRENCY", "4")),
+        max_retries=int(os.getenv("CLAUDE_MAX_RETRIES", "5")),
+        deadline_seconds=float(os.getenv("CLAUDE_REQUEST_DEADLINE", "60")),
+        router=ModelRouter(
+            CLAUDE_MODEL,
+            short_model=os.getenv("CLAUDE_SHORT_MODEL", "claude-3-haiku-20240307"),
+            long_model=os.getenv("CLAUDE_LONG_MODEL"),
+            short_words=int(os.getenv("SHORT_QUESTION_WORDS", "16")),
+            long_words=int(os.getenv("LONG_QUESTION_WORDS", "40"))
+        ) if os.getenv("MODEL_ROUTING", "1") == "1" else None
+    )
+
+    fuzzy_threshold = float(os.getenv("FUZZY_MATCH_THRESHOLD", "0.85"))
+    fuzzy_index = None
+    if fuzzy_threshold > 0:
+        fuzzy_index = FuzzyQuestionIndex.from_cache(answer_cache, llm_client.router.models, threshold=fuzzy_threshold)
+
+    per_card, per_deck, _ = runtime_estimates(load_last_metrics())
+    scheduler = DeckScheduler(args.order, args.time_budget, per_card, per_deck)
+    settings = run_settings(args)
+    paths = curriculum_indexes(homepages)
+    click_strategies = ClickStrategyCache(os.getenv("CLICK_STRATEGIES_PATH", "click-strategies.json"))
+    http_crawl = os.getenv("HTTP_CRAWL", "1") == "1"
+    trace = None
+    if args.record:
+        # Everything replay needs to take the same path through the curriculum
+        trace = TraceRecorder(args.record, header={
+            "paths": [
+                {
+                    "homepage_url": homepage_url,
+                    "curriculum": index.data,
+                    "index_stale": index.is_stale(homepage_url, ignore_age=args.resume),
+                }
+                for homepage_url, index in paths
+            ],
+            "model": CLAUDE_MODEL,
+            "resume": args.resume,
+            "order": args.order,
+            "http_crawl": http_crawl,
+            "settings": settings,
+            "click_strategies": click_strategies.selectors,
+        })
+
+    run_profiler = RunProfiler(args.profile) if args.profile else None
+    bot = FlashcardAutomation(
+        claude_api_key,
+        llm_client=llm_client,
+        answer_cache=answer_cache,
+        fuzzy_index=fuzzy_index,
+        curriculum_index=paths[0][1],
+        run_ledger=RunLedger(os.getenv("RUN_LEDGER_PATH", "run-ledger.jsonl")),
+        metrics=Metrics(export_path=os.getenv("METRICS_PATH", "run-metrics.json")),
+        artifacts=ArtifactWriter(
+            directory=os.getenv("ARTIFACTS_DIR", "artifacts"),
+            min_interval=float(os.getenv("ARTIFACT_MIN_INTERVAL", "5")),
+            max_per_signature=int(os.getenv("ARTIFACT_MAX_PER_ERROR", "3")),
+            snapshot_count=int(os.getenv("ARTIFACT_SNAPSHOTS", "20"))
+        ),
+        browser=BrowserManager(
+            debugger_address=os.getenv("CHROME_DEBUGGER_ADDRESS"),
+            user_data_dir=os.getenv("CHROME_USER_DATA_DIR"),
+            chrome_binary=os.getenv("CHROME_BINARY")
+        ),
+        memory_watchdog=MemoryWatchdog(
+            rss_limit_mb=float(os.getenv("CHROME_RSS_LIMIT_MB", "3072")),
+            heap_limit_mb=float(os.getenv("JS_HEAP_LIMIT_MB", "768"))
+        ),
+        click_strategies=click_strategies,
+        http_crawler=HttpCrawler(max_workers=int(os.getenv("HTTP_CRAWL_WORKERS", "8"))) if http_crawl else None,
+        trace=trace,
+        scheduler=scheduler,
+        profiler=run_profiler.webdriver if run_profiler else None,
+        **settings
+    )
     try:
-        bot.start(homepage_url)
-        input("Please log in manually and press Enter when ready...")
+        # One browser session, login, answer cache and connection pool for every path
+        bot.start(homepages[0])
+        if bot.is_logged_in():
+            print("Already logged in - skipping the login prompt")
+        else:
+            input("Please log in manually and press Enter when ready...")
         print("\nStarting automation...\n")
-        bot.process_all_content()
+        if run_profiler:
+            # Started after the login prompt so waiting for the user is not profiled
+            run_profiler.start()
+        bot.process_paths(paths, resume=args.resume)
     except Exception as e:
         print(f"Critical error: {str(e)}")
-        bot.driver.save_screenshot("final-error.png")
+        bot.artifacts.capture("final-error", e)
+    finally:
+        bot.cleanup()
+        if run_profiler:
+            run_profiler.stop()
+
+
+def replay_command(args):
+    from artifacts import ArtifactWriter
+    from automation import CLAUDE_MODEL, FlashcardAutomation
+    from click_strategies import ClickStrategyCache
+    from http_crawler import HttpCrawler
+    from llm_client import LLMClient
+    from metrics import Metrics
+    from profiler import RunProfiler
+    from run_trace import TraceRecorder, TraceReplay, print_summary
+
+    replay = TraceReplay(args.trace)
+    header = replay.header
+    if not header:
+        print(f"{args.trace} has no trace header - was it written by `run --record`?")
+        return
+
+    # Start from the state the recorded run started from, not from today's saved files
+    paths = []
+    # Traces recorded before multi-path runs hold a single path in the header itself
+    for recorded in header.get("paths") or [header]:
+        index = CurriculumIndex(path=None, max_age_hours=float("inf"))
+        index.data = recorded["curriculum"]
+        if recorded["index_stale"]:
+            index.mark_stale()
+        paths.append((recorded["homepage_url"], index))
+    click_strategies = ClickStrategyCache(path=None)
+    click_strategies.selectors = header["click_strategies"]
+    answer_cache = AnswerCache(path=":memory:")
+    for question, answer in replay.cached_answers.items():
+        answer_cache.put(question, header.get("model", CLAUDE_MODEL), answer)
+
+    http_crawler = None
+    if header["http_crawl"]:
+        http_crawler = HttpCrawler()
+        replay.attach_http(http_crawler)
+
+    trace = TraceRecorder(args.record, header=header, realtime=False)
+    run_profiler = RunProfiler(args.profile) if args.profile else None
+    bot = FlashcardAutomation(
+        None,
+        driver=replay.driver(),
+        llm_client=LLMClient(
+            api_key=None,
+            model=header.get("model", CLAUDE_MODEL),
+            requests_per_minute=1e9,
+            tokens_per_minute=1e9,
+            async_client=replay.anthropic()
+        ),
+        answer_cache=answer_cache,
+        curriculum_index=paths[0][1],
+        click_strategies=click_strategies,
+        http_crawler=http_crawler,
+        metrics=Metrics(),
+        artifacts=ArtifactWriter(directory=os.getenv("ARTIFACTS_DIR", "artifacts")),
+        trace=trace,
+        # Same order as recorded; the time budget is left out since replay runs much faster
+        scheduler=DeckScheduler(header.get("order", "page")),
+        profiler=run_profiler.webdriver if run_profiler else None,
+        **header["settings"]
+    )
+    try:
+        bot.start(paths[0][0])
+        if run_profiler:
+            run_profiler.start()
+        bot.process_paths(paths, resume=header["resume"])
     finally:
         bot.cleanup()
+        if run_profiler:
+            run_profiler.stop()
+    replay.print_stats()
+    print_summary(trace.events)
+
+
+def compare_command(args):
+    from run_trace import compare_traces
+
+    compare_traces(args.before, args.after)
+
+
+def main():
+    args = parse_args()
+    {
+        "run": run_command,
+        "plan": plan_command,
+        "stats": stats_command,
+        "cache": cache_command,
+        "replay": replay_command,
+        "compare": compare_command,
+    }[args.command](args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
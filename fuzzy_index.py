@@ -0,0 +1,219 @@
+import heapq
+import math
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from answer_cache import normalize_question
+from metrics import percentile
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "being", "do", "does", "did",
+    "what", "which", "who", "whom", "whose", "how", "why", "when", "where", "this", "that", "these",
+    "those", "it", "its", "of", "in", "on", "at", "to", "for", "from", "by", "with", "about", "as",
+    "and", "or", "can", "could", "would", "should", "will", "you", "your", "we", "our", "i", "my",
+    "me", "there", "here", "into", "if", "so", "than", "then", "some", "any", "use", "used", "using",
+    "mean", "means", "explain", "describe", "give", "example", "called", "name"
+}
+
+# Conventional names for libraries and their objects in code, so "`df.groupby`" and "groupby in
+# pandas" share a term
+ALIASES = {
+    "df": "pandas", "pd": "pandas", "np": "numpy", "plt": "matplotlib", "sns": "seaborn",
+    "tf": "tensorflow", "sk": "sklearn", "scikit": "sklearn"
+}
+
+# Suffixes stripped by the light stemmer, longest first
+SUFFIXES = ("ations", "ation", "ings", "ing", "edly", "ed", "ies", "es", "ly", "s")
+
+
+def stem(token: str) -> str:
+    """Very light suffix stripping, enough to make 'returned'/'returns'/'return' match"""
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            return token + "y" if suffix == "ies" else token
+    return token
+
+
+# Inline code and fenced blocks
+CODE_SPAN = re.compile(r"`+([^`]+)`+")
+
+# A code span that is only a name ("groupby", "df.groupby"), whose tokens already say everything
+NAME = re.compile(r"\s*[a-z_][\w.]*\s*")
+
+TOKEN = re.compile(
+    r"(?<![\w-])--?[a-z0-9][\w-]*"          # command-line flags: -a, --force
+    r"|[a-z0-9]+"                            # words and identifiers
+    r"|!=+|[+*/%=<>&|^~][-+*/%=<>&|^~]*"     # operators
+    r"|(?<![a-z0-9])-[-+*/%=<>&|^~]*"        # operators starting with "-", but not a hyphen inside a word
+)
+
+OPERATOR_CHARS = set("-+*/%=<>!&|^~")
+
+
+def text_terms(text: str) -> Set[str]:
+    """Stemmed content words of prose, plus its flags and operators"""
+    terms = set()
+    for token in TOKEN.findall(text):
+        if token[0] in OPERATOR_CHARS:
+            terms.add(token)
+        elif token in ALIASES:
+            terms.add(stem(ALIASES[token]))
+        elif token not in STOPWORDS:
+            terms.add(stem(token))
+    return terms
+
+
+def question_terms(question: str) -> Set[str]:
+    """Terms of a question: stemmed content words ("df.groupby" -> {"panda", "groupby"}), flags and
+    operators, and for code spans every token unstemmed plus, unless the span is just a name, the
+    whole span ("`ls -a`" -> {"`ls-a`", "ls", "-a"}), so one-letter names and stopwords in code
+    still count"""
+    question = question.lower()
+    terms = set()
+    for code in CODE_SPAN.findall(question):
+        if not NAME.fullmatch(code):
+            terms.add("`" + re.sub(r"\s+", "", code) + "`")
+        terms.update(stem(ALIASES[token]) if token in ALIASES else token for token in TOKEN.findall(code))
+    terms |= text_terms(CODE_SPAN.sub(" ", question))
+    return terms
+
+
+class FuzzyQuestionIndex:
+    """In-memory retrieval index over answered questions, for reusing answers across rewordings.
+
+    Questions are reduced to stemmed content words and scored by IDF-weighted cosine similarity,
+    so rare terms (e.g. "groupby") decide a match and common ones (e.g. "return") barely count.
+    Candidates come from an inverted index; terms found in more than max_postings questions are
+    not used to gather candidates (they cannot push a pair over the threshold on their own),
+    which keeps lookups well under a millisecond at tens of thousands of questions.
+    """
+
+    def __init__(self, threshold: float = 0.85, max_postings: int = 500, max_candidates: int = 32):
+        self.threshold = threshold
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+        self.hits = 0
+        self.misses = 0
+        self.lookup_seconds: List[float] = []
+        self._terms: List[Set[str]] = []
+        self._answers: List[str] = []
+        self._questions: List[str] = []
+        self._by_text: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        # Squared IDF weights and document norms, cleared whenever a question is added
+        self._weights: Dict[str, float] = {}
+        self._norms: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_cache(cls, answer_cache, models: List[str], **kwargs) -> "FuzzyQuestionIndex":
+        """Build the index from every answer the cache holds for any of models"""
+        index = cls(**kwargs)
+        for model in models:
+            for question, answer in answer_cache.entries(model):
+                index.add(question, answer)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    def _weight(self, term: str) -> float:
+        weight = self._weights.get(term)
+        if weight is None:
+            idf = math.log(1 + (len(self._answers) + 1) / (len(self._postings.get(term, ())) + 1))
+            weight = self._weights[term] = idf * idf
+        return weight
+
+    def _norm(self, doc_id: int) -> float:
+        norm = self._norms.get(doc_id)
+        if norm is None:
+            norm = self._norms[doc_id] = math.sqrt(sum(self._weight(term) for term in self._terms[doc_id]))
+        return norm
+
+    def add(self, question: str, answer: str):
+        """Index an answered question; the same normalized question replaces the older answer"""
+        terms = question_terms(question)
+        if not terms:
+            return
+        key = normalize_question(question)
+        with self._lock:
+            doc_id = self._by_text.get(key)
+            if doc_id is not None:
+                self._answers[doc_id] = answer
+                self._questions[doc_id] = question
+                return
+            doc_id = len(self._answers)
+            self._by_text[key] = doc_id
+            self._terms.append(terms)
+            self._answers.append(answer)
+            self._questions.append(question)
+            for term in terms:
+                self._postings.setdefault(term, []).append(doc_id)
+            self._weights.clear()
+            self._norms.clear()
+
+    def match(self, question: str) -> Optional[Tuple[str, str, float]]:
+        """Return (matched question, answer, score) for the most similar indexed question scoring
+        at least the threshold, or None"""
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                result = self._best_match(question)
+        finally:
+            self.lookup_seconds.append(time.perf_counter() - started)
+        if result:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return result
+
+    def _best_match(self, question: str) -> Optional[Tuple[str, str, float]]:
+        if not self._answers:
+            return None
+
+        doc_id = self._by_text.get(normalize_question(question))
+        if doc_id is not None:
+            return self._questions[doc_id], self._answers[doc_id], 1.0
+
+        terms = question_terms(question)
+        if not terms:
+            return None
+
+        weights = {term: self._weight(term) for term in terms}
+        query_norm = math.sqrt(sum(weights.values()))
+
+        # Shared weight per candidate, gathered from the rarer terms only
+        overlap: Dict[int, float] = {}
+        for term in sorted(terms, key=lambda t: len(self._postings.get(t, ()))):
+            postings = self._postings.get(term)
+            if not postings or len(postings) > self.max_postings:
+                continue
+            for doc_id in postings:
+                overlap[doc_id] = overlap.get(doc_id, 0.0) + weights[term]
+        if not overlap:
+            return None
+
+        best_id, best_score = None, 0.0
+        for doc_id in heapq.nlargest(self.max_candidates, overlap, key=overlap.get):
+            shared = sum(weights[term] for term in terms & self._terms[doc_id])
+            score = shared / (query_norm * self._norm(doc_id))
+            if score > best_score:
+                best_id, best_score = doc_id, score
+
+        if best_id is None or best_score < self.threshold:
+            return None
+        return self._questions[best_id], self._answers[best_id], best_score
+
+    def print_stats(self):
+        """Print hit rate and lookup latency for this run"""
+        lookups = self.hits + self.misses
+        if not lookups:
+            return
+        timings = sorted(self.lookup_seconds)
+        print(f"Fuzzy question index: {self.hits} hits, {self.misses} misses "
+              f"({self.hits / lookups * 100:.1f}% hit rate), {len(self)} questions indexed, "
+              f"lookup p50 {percentile(timings, 0.5) * 1000:.3f} ms / "
+              f"p95 {percentile(timings, 0.95) * 1000:.3f} ms / max {timings[-1] * 1000:.3f} ms")
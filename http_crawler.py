@@ -0,0 +1,208 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from progress_tracker import parse_progress
+
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class HttpCrawlError(Exception):
+    """A page could not be read over HTTP (e.g. the session cookies are not accepted)"""
+
+
+class Node:
+    """Minimal element tree node, enough for the few selectors the crawler needs"""
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Node"] = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children: List["Node"] = []
+        self.texts: List[str] = []
+
+    @property
+    def classes(self) -> List[str]:
+        return self.attrs.get("class", "").split()
+
+    def iter(self) -> Iterator["Node"]:
+        for child in self.children:
+            yield child
+            yield from child.iter()
+
+    def find_all(self, tag: Optional[str] = None, cls: Optional[str] = None, id: Optional[str] = None) -> List["Node"]:
+        return [
+            node for node in self.iter()
+            if (tag is None or node.tag == tag)
+            and (cls is None or cls in node.classes)
+            and (id is None or node.attrs.get("id") == id)
+        ]
+
+    def find(self, tag: Optional[str] = None, cls: Optional[str] = None, id: Optional[str] = None) -> Optional["Node"]:
+        return next(iter(self.find_all(tag, cls, id)), None)
+
+    def next_element_sibling(self) -> Optional["Node"]:
+        if not self.parent:
+            return None
+        siblings = self.parent.children
+        index = siblings.index(self)
+        return siblings[index + 1] if index + 1 < len(siblings) else None
+
+    def text(self) -> str:
+        parts = list(self.texts)
+        for child in self.children:
+            parts.append(child.text())
+        return re.sub(r"\s+", " ", " ".join(parts)).strip()
+
+
+class TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        # Tolerate unclosed elements by popping back to the matching open tag, if any
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].texts.append(data)
+
+
+def parse_html(html: str) -> Node:
+    builder = TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def parse_modules(html: str, base_url: str) -> List[Dict]:
+    """Modules from the `.modules-nav > a` links, like find_all_modules"""
+    root = parse_html(html)
+    modules = []
+    for nav in root.find_all(cls="modules-nav"):
+        for link in nav.children:
+            if link.tag != "a" or not link.attrs.get("href"):
+                continue
+            name_element = link.find(cls="module-header-name")
+            name = name_element.text() if name_element else link.attrs.get("data-original-title", "")
+            modules.append({
+                "name": name or "Unknown",
+                "href": urljoin(base_url, link.attrs["href"]),
+                "path": link.attrs["href"],
+                "isActive": "active" in link.classes
+            })
+    return modules
+
+
+def parse_days(html: str, base_url: str) -> List[Dict]:
+    """Days with a flashcard deck, from `#days-nav .day` and the exercises container after each"""
+    root = parse_html(html)
+    days_nav = root.find(id="days-nav")
+    if not days_nav:
+        return []
+
+    days = []
+    for day in days_nav.find_all(cls="day"):
+        title_element = day.find("div")
+        title = (title_element or day).text() or "Unknown"
+        exercises = day.next_element_sibling()
+        link = next(
+            (a for a in exercises.find_all("a", cls="exercise") if "nav-flashcards" in a.classes),
+            None
+        ) if exercises else None
+        if link and link.attrs.get("href"):
+            days.append({
+                "title": title,
+                "decks": [{"url": urljoin(base_url, link.attrs["href"]), "completed": 0, "total": 0}]
+            })
+    return days
+
+
+def parse_deck_progress(html: str) -> Optional[Tuple[int, int]]:
+    """(completed, total) from the deck stats message, like get_flashcard_progress"""
+    stats = parse_html(html).find(cls="deck-stats-message")
+    return parse_progress(stats.text()) if stats else None
+
+
+class HttpCrawler:
+    """Read-only Kitt client: a pooled requests.Session carrying the logged-in browser's cookies
+    fetches module and deck pages concurrently and parses them without rendering"""
+
+    def __init__(self, max_workers: int = 8, timeout: float = 15):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.requests = 0
+
+    def load_cookies(self, driver):
+        """Copy the browser session (cookies and user agent) so requests are made as the logged-in user"""
+        self.session.cookies.clear()
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/")
+            )
+        self.session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+
+    def fetch(self, url: str) -> str:
+        try:
+            self.requests += 1
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise HttpCrawlError(f"{url}: {str(e)}") from e
+        if re.search(r"sign_in|sign-in|login|oauth", response.url, re.IGNORECASE):
+            raise HttpCrawlError(f"{url} redirected to a login page - the browser session was not accepted")
+        return response.text
+
+    def crawl_curriculum(self, homepage_url: str) -> List[Dict]:
+        """The module → day → deck tree in the format crawl_curriculum produces, fetching modules in parallel"""
+        modules = parse_modules(self.fetch(homepage_url), homepage_url)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="http-crawl") as executor:
+            pages = list(executor.map(lambda module: self.fetch(module["href"]), modules))
+
+        tree = []
+        for module, html in zip(modules, pages):
+            days = parse_days(html, module["href"])
+            print(f"Indexed {len(days)} flashcard decks in {module['name']} over HTTP")
+            tree.append({"name": module["name"], "href": module["href"], "path": module["path"], "days": days})
+        return tree
+
+    def deck_progress(self, urls: List[str]) -> Dict[str, Tuple[int, int]]:
+        """(completed, total) for each deck page that could be read and parsed"""
+        def read(url):
+            try:
+                return url, parse_deck_progress(self.fetch(url))
+            except HttpCrawlError as e:
+                print(f"Could not read deck progress over HTTP: {str(e)}")
+                return url, None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="http-crawl") as executor:
+            return {url: progress for url, progress in executor.map(read, urls) if progress}
+
+    def close(self):
+        self.session.close()
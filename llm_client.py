@@ -0,0 +1,390 @@
+import asyncio
+import json
+import queue
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Iterator, List, NamedTuple, Optional
+
+from anthropic import AsyncAnthropic, APIConnectionError, APIStatusError
+
+from model_router import ModelRouter, Route
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors/overload
+RETRYABLE_STATUSES = {408, 409, 429}
+
+BATCH_SYSTEM_PROMPT = (
+    "You answer flashcard questions from a coding bootcamp. You will receive a JSON array of "
+    "objects with an id and a question. Reply with only a JSON array, with no other text, "
+    'containing one object per question: {"id": <the question id>, "answer": "<a short answer, '
+    'at most a few sentences>"}.'
+)
+
+# Output tokens budgeted per question in a batched request
+BATCH_TOKENS_PER_QUESTION = 200
+
+
+def parse_batch_answers(text: str, count: int) -> List[Optional[str]]:
+    """Map a batched JSON reply back to question positions; unusable entries stay None"""
+    answers: List[Optional[str]] = [None] * count
+    start = text.find("[")
+    if start < 0:
+        return answers
+    try:
+        # Decode just the first array, so text after it (even with brackets) is ignored
+        items, _ = json.JSONDecoder().raw_decode(text, start)
+    except ValueError:
+        return answers
+    if not isinstance(items, list):
+        return answers
+
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        question_id = item.get("id")
+        answer = item.get("answer")
+        if isinstance(question_id, int) and 1 <= question_id <= count and isinstance(answer, str) and answer.strip():
+            answers[question_id - 1] = answer.strip()
+    return answers
+
+
+def apply_answer_budget(text: str, max_chars: Optional[int] = None, max_sentences: Optional[int] = None,
+                        final: bool = False):
+    """Trim text to the character/sentence budget. Returns (text, budget_reached).
+
+    While streaming (final=False) a terminator only ends a sentence once whitespace follows it,
+    since a chunk ending in "Python 3." may continue with "12".
+    """
+    if max_sentences:
+        terminator = r"[.!?](?=\s|$)" if final else r"[.!?](?=\s)"
+        ends = [match.end() for match in re.finditer(terminator, text)]
+        if len(ends) >= max_sentences:
+            return text[:ends[max_sentences - 1]], True
+    if max_chars and len(text) >= max_chars:
+        cut = text[:max_chars]
+        # Prefer ending on a sentence or word boundary inside the budget
+        boundary = max(cut.rfind(". "), cut.rfind("\n"))
+        if boundary < max_chars // 2:
+            boundary = cut.rfind(" ")
+        return (cut[:boundary + 1] if boundary > 0 else cut).rstrip(), True
+    return text, False
+
+
+class Answer(NamedTuple):
+    text: str
+    # The model the router sent the question to, which answers are cached under
+    model: str
+
+
+class LLMError(Exception):
+    """A question could not be answered; the card should be retried rather than submitted"""
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at rate_per_minute, holding at most one minute of tokens"""
+
+    def __init__(self, rate_per_minute: float):
+        self.rate_per_second = rate_per_minute / 60
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate_per_second)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        """Wait until amount tokens are available (or a pause has passed), then take them"""
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            pause = self.paused_until - time.monotonic()
+            if pause <= 0 and self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep(max(pause, (amount - self.tokens) / self.rate_per_second))
+
+    def adjust(self, amount: float):
+        """Charge (positive) or refund (negative) tokens once the real cost is known"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+    def pause(self, seconds: float):
+        """Hold back every caller, e.g. while the API asks us to retry after a delay"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class LLMClient:
+    """Async Anthropic client on a background event loop with RPM/TPM limits, a concurrency cap,
+    jittered exponential backoff that honors retry-after, and a per-request deadline"""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        model: str,
+        max_tokens: int = 1024,
+        requests_per_minute: float = 50,
+        tokens_per_minute: float = 50000,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        deadline_seconds: float = 60,
+        async_client=None,
+        router: Optional[ModelRouter] = None
+    ):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_retries = max_retries
+        self.deadline_seconds = deadline_seconds
+        # Without a router every question goes to model with max_tokens, but calls are still accounted
+        self.router = router or ModelRouter(model, standard_max_tokens=max_tokens, routing=False)
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.client = async_client or AsyncAnthropic(api_key=api_key, max_retries=0, timeout=deadline_seconds)
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.batch_calls = 0
+        self.batch_fallbacks = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+        self._semaphore = asyncio.run_coroutine_threadsafe(self._make_semaphore(max_concurrency), self._loop).result()
+
+    @staticmethod
+    async def _make_semaphore(limit: int) -> asyncio.Semaphore:
+        return asyncio.Semaphore(limit)
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count (about four characters per token)"""
+        return len(text) // 4 + 1
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Seconds to wait before retry attempt, preferring the server's retry-after header"""
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after_ms = response.headers.get("retry-after-ms")
+            retry_after = response.headers.get("retry-after")
+            try:
+                if retry_after_ms:
+                    return float(retry_after_ms) / 1000
+                if retry_after:
+                    return float(retry_after)
+            except ValueError:
+                pass
+        return min(30.0, 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        if isinstance(error, APIConnectionError):
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code in RETRYABLE_STATUSES or error.status_code >= 500
+        return False
+
+    async def _with_retries(self, estimated: int, call):
+        """Run call() under the rate limits and concurrency cap, retrying transient failures
+        with jittered backoff that honors retry-after"""
+        for attempt in range(self.max_retries + 1):
+            await self.requests.acquire()
+            await self.tokens.acquire(estimated)
+            try:
+                async with self._semaphore:
+                    self.calls += 1
+                    return await call()
+            except Exception as e:
+                if not self.is_retryable(e) or attempt == self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt, e)
+                if isinstance(e, APIStatusError) and e.status_code == 429:
+                    self.requests.pause(delay)
+                self.retries += 1
+                print(f"Claude API error ({str(e)}), retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+
+    async def _create(self, **request):
+        """One rate-limited API call, retried on transient failures"""
+        estimated = self.estimate_tokens(str(request.get("messages"))) + request["max_tokens"] // 4
+        response = await self._with_retries(estimated, lambda: self.client.messages.create(**request))
+        usage = getattr(response, "usage", None)
+        if usage:
+            self.tokens.adjust(usage.input_tokens + usage.output_tokens - estimated)
+        return response
+
+    def _account(self, route: Route, started: float, response, prompt: str, questions: int = 1,
+                 deck: Optional[str] = None):
+        """Record a finished call's latency, tokens (estimated if the response has no usage) and
+        cost, priced for the model the response reports (an alias resolves to a dated model)"""
+        usage = getattr(response, "usage", None)
+        text = response.content[0].text
+        self.router.record(
+            route,
+            time.perf_counter() - started,
+            usage.input_tokens if usage else self.estimate_tokens(prompt),
+            usage.output_tokens if usage else self.estimate_tokens(text),
+            truncated=getattr(response, "stop_reason", None) == "max_tokens",
+            questions=questions,
+            model=getattr(response, "model", None) or route.model,
+            deck=deck
+        )
+
+    async def acreate(self, question: str, deck: Optional[str] = None) -> Answer:
+        """Answer a question (from deck) on the model and token budget the router picks for it,
+        raising LLMError on failure or when the deadline passes"""
+        route = self.router.route(question, deck)
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self._create(
+                    model=route.model,
+                    max_tokens=route.max_tokens,
+                    messages=[{"role": "user", "content": question}]
+                ),
+                self.deadline_seconds
+            )
+            self._account(route, started, response, question, deck=deck)
+            return Answer(response.content[0].text, route.model)
+        except asyncio.TimeoutError:
+            self.failures += 1
+            raise LLMError(f"no answer within {self.deadline_seconds}s")
+        except Exception as e:
+            self.failures += 1
+            raise LLMError(str(e)) from e
+
+    async def acreate_batch(self, questions: List[str], deck: Optional[str] = None) -> List[Optional[Answer]]:
+        """Answer several questions with one request, falling back to single requests for any
+        the batched reply does not answer. Failed questions come back as None."""
+        prompt = json.dumps(
+            [{"id": i + 1, "question": question} for i, question in enumerate(questions)],
+            ensure_ascii=False
+        )
+        route = self.router.route_batch(questions, deck)
+        started = time.perf_counter()
+        try:
+            self.batch_calls += 1
+            response = await asyncio.wait_for(
+                self._create(
+                    model=route.model,
+                    max_tokens=min(8192, BATCH_TOKENS_PER_QUESTION * len(questions) + 100),
+                    system=BATCH_SYSTEM_PROMPT,
+                    messages=[{"role": "user", "content": prompt}]
+                ),
+                self.deadline_seconds
+            )
+            self._account(route, started, response, BATCH_SYSTEM_PROMPT + prompt, questions=len(questions), deck=deck)
+            answers = [
+                Answer(text, route.model) if text is not None else None
+                for text in parse_batch_answers(response.content[0].text, len(questions))
+            ]
+        except Exception as e:
+            print(f"Batched Claude request failed ({str(e) or type(e).__name__}), asking one by one")
+            answers = [None] * len(questions)
+
+        missing = [i for i, answer in enumerate(answers) if answer is None]
+        if missing:
+            self.batch_fallbacks += len(missing)
+            results = await asyncio.gather(*(self.acreate(questions[i], deck) for i in missing), return_exceptions=True)
+            for i, result in zip(missing, results):
+                answers[i] = None if isinstance(result, Exception) else result
+        return answers
+
+    def answer_batch(self, questions: List[str], deck: Optional[str] = None) -> List[Optional[Answer]]:
+        """Blocking wrapper around acreate_batch for synchronous callers"""
+        return asyncio.run_coroutine_threadsafe(self.acreate_batch(questions, deck), self._loop).result()
+
+    def stream(self, question: str, route: Optional[Route] = None) -> Iterator[str]:
+        """Yield answer text chunks as they arrive, on route (default: the router's choice for the
+        question). Closing the generator early cancels the request, which is how callers stop once
+        they have enough of an answer.
+
+        Opening the stream is retried like any other call; once text has been yielded a failure
+        ends the answer. The deadline covers the whole request, retries included.
+        """
+        chunks: "queue.Queue" = queue.Queue()
+        finished = object()
+        route = route or self.router.route(question)
+        deadline = time.monotonic() + self.deadline_seconds
+        received = []
+
+        async def consume():
+            try:
+                async with self.client.messages.stream(
+                    model=route.model,
+                    max_tokens=route.max_tokens,
+                    messages=[{"role": "user", "content": question}]
+                ) as stream:
+                    async for text in stream.text_stream:
+                        received.append(text)
+                        chunks.put(text)
+            except Exception as e:
+                if received:
+                    # Part of the answer already reached the caller, so it cannot be asked again
+                    raise LLMError(f"answer stream broke off: {str(e)}") from e
+                raise
+
+        async def run():
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(
+                    self._with_retries(self.estimate_tokens(question) + route.max_tokens // 4, consume),
+                    self.deadline_seconds
+                )
+                chunks.put(finished)
+            except asyncio.TimeoutError:
+                chunks.put(LLMError(f"no complete answer within {self.deadline_seconds}s"))
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                # Usage is not reported for a stream cut short, so tokens are estimated from the text
+                if received:
+                    self.router.record(
+                        route, time.perf_counter() - started,
+                        self.estimate_tokens(question), self.estimate_tokens("".join(received))
+                    )
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._loop)
+        try:
+            while True:
+                try:
+                    # run() gives up at the deadline itself; this only guards against a stuck event loop
+                    item = chunks.get(timeout=max(0.0, deadline - time.monotonic()) + 5)
+                except queue.Empty:
+                    self.failures += 1
+                    raise LLMError(f"no complete answer within {self.deadline_seconds}s")
+                if item is finished:
+                    return
+                if isinstance(item, Exception):
+                    self.failures += 1
+                    raise LLMError(str(item)) from item
+                yield item
+        finally:
+            future.cancel()
+
+    def submit(self, question: str, deck: Optional[str] = None) -> Future:
+        """Schedule a question on the client's event loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(self.acreate(question, deck), self._loop)
+
+    def answer(self, question: str, deck: Optional[str] = None) -> Answer:
+        """Blocking wrapper around acreate for synchronous callers"""
+        return self.submit(question, deck).result()
+
+    def print_stats(self):
+        print(f"Claude API: {self.calls} calls, {self.retries} retries, {self.failures} failed questions")
+        if self.batch_calls:
+            print(f"Batched requests: {self.batch_calls}, {self.batch_fallbacks} questions answered one by one")
+        self.router.print_stats()
+
+    def close(self):
+        if hasattr(self.client, "close"):
+            try:
+                asyncio.run_coroutine_threadsafe(self.client.close(), self._loop).result(timeout=5)
+            except Exception as e:
+                print(f"Error closing Claude client: {str(e)}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,92 @@
+import os
+from typing import Dict, List, Optional
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def child_processes(root_pid: int) -> List[int]:
+    """root_pid and all its descendants, from the parent pids in /proc/<pid>/stat (Linux only)"""
+    parents: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name is parenthesised and may contain spaces, so split after it
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    tree = [root_pid]
+    for pid in tree:
+        tree.extend(child for child, parent in parents.items() if parent == pid)
+    return tree
+
+
+def process_rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+class MemoryWatchdog:
+    """Samples browser memory at deck boundaries and says when the tab or browser should be recycled.
+
+    rss_limit_mb applies to the summed RSS of chromedriver and every Chrome process it started,
+    read from /proc (skipped where /proc is missing or the browser was attached to rather than
+    launched). heap_limit_mb applies to the page's performance.memory.usedJSHeapSize.
+    """
+
+    def __init__(self, rss_limit_mb: float = 3072, heap_limit_mb: float = 768):
+        self.rss_limit_mb = rss_limit_mb
+        self.heap_limit_mb = heap_limit_mb
+        self.peak_rss_mb = 0.0
+        self.peak_heap_mb = 0.0
+        self.tab_recycles = 0
+        self.browser_recycles = 0
+
+    def chrome_rss_mb(self, driver, attached: bool = False) -> Optional[float]:
+        """None for an attached browser: it is not a child of our chromedriver, and not ours to restart"""
+        process = getattr(getattr(driver, "service", None), "process", None)
+        if attached or process is None or not os.path.isdir("/proc"):
+            return None
+        return sum(process_rss_bytes(pid) for pid in child_processes(process.pid)) / 1024 / 1024
+
+    @staticmethod
+    def js_heap_mb(driver) -> Optional[float]:
+        try:
+            used = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null;")
+        except Exception:
+            return None
+        return used / 1024 / 1024 if used else None
+
+    def sample(self, driver, attached: bool = False) -> Dict[str, Optional[float]]:
+        rss = self.chrome_rss_mb(driver, attached)
+        heap = self.js_heap_mb(driver)
+        if rss:
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+        if heap:
+            self.peak_heap_mb = max(self.peak_heap_mb, heap)
+        return {"rss_mb": rss, "heap_mb": heap}
+
+    def check(self, driver, attached: bool = False) -> Optional[str]:
+        """'browser' when Chrome as a whole is over its RSS limit, 'tab' when only the page heap is, else None.
+        An attached browser is never reported for a restart, only its page heap is checked."""
+        sample = self.sample(driver, attached)
+        if sample["rss_mb"] and sample["rss_mb"] > self.rss_limit_mb:
+            print(f"Chrome is using {sample['rss_mb']:.0f} MB (limit {self.rss_limit_mb:.0f} MB)")
+            return "browser"
+        if sample["heap_mb"] and sample["heap_mb"] > self.heap_limit_mb:
+            print(f"Page JS heap is {sample['heap_mb']:.0f} MB (limit {self.heap_limit_mb:.0f} MB)")
+            return "tab"
+        return None
+
+    def print_stats(self):
+        if not (self.peak_rss_mb or self.peak_heap_mb):
+            return
+        rss = f"peak Chrome RSS {self.peak_rss_mb:.0f} MB, " if self.peak_rss_mb else ""
+        print(f"Memory: {rss}peak JS heap {self.peak_heap_mb:.0f} MB, "
+              f"{self.tab_recycles} tab recycles, {self.browser_recycles} browser restarts")
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Metrics:
+    """Nested timing spans with per-phase p50/p95/max aggregates and JSON or Prometheus textfile export"""
+
+    def __init__(self, export_path: Optional[str] = None):
+        self.export_path = export_path
+        self.spans: List[Dict] = []
+        self.counters: Dict[str, float] = {}
+        self.started_at = time.time()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[int]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _add(self, name: str, seconds: float, label: Optional[str], parent: Optional[int], start: float) -> int:
+        with self._lock:
+            span_id = len(self.spans)
+            self.spans.append({
+                "id": span_id,
+                "parent": parent,
+                "name": name,
+                "label": label,
+                "start": start,
+                "seconds": seconds
+            })
+            return span_id
+
+    @contextmanager
+    def span(self, name: str, label: Optional[str] = None):
+        """Time a phase; spans opened inside it on the same thread become its children"""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        span_id = self._add(name, 0.0, label, parent, time.time())
+        stack.append(span_id)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[span_id]["seconds"] = time.perf_counter() - start
+            stack.pop()
+
+    def record(self, name: str, seconds: float, label: Optional[str] = None):
+        """Record a phase timed elsewhere (e.g. inside the page) as a child of the current span"""
+        stack = self._stack()
+        self._add(name, seconds, label, stack[-1] if stack else None, time.time() - seconds)
+
+    def increment(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-phase count, total, p50, p95 and max in seconds"""
+        by_name: Dict[str, List[float]] = {}
+        with self._lock:
+            for span in self.spans:
+                by_name.setdefault(span["name"], []).append(span["seconds"])
+
+        summary = {}
+        for name, values in by_name.items():
+            values.sort()
+            summary[name] = {
+                "count": len(values),
+                "total": sum(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "max": values[-1]
+            }
+        return summary
+
+    def print_summary(self):
+        """Print the per-phase aggregates, slowest total first"""
+        summary = self.summary()
+        if not summary:
+            return
+        print(f"\n{'Phase':<24}{'Count':>8}{'Total s':>10}{'p50 s':>9}{'p95 s':>9}{'Max s':>9}")
+        for name, stats in sorted(summary.items(), key=lambda item: -item[1]["total"]):
+            print(f"{name:<24}{stats['count']:>8}{stats['total']:>10.1f}{stats['p50']:>9.2f}"
+                  f"{stats['p95']:>9.2f}{stats['max']:>9.2f}")
+
+    def span_tree(self) -> List[Dict]:
+        """Spans nested under their parents, for the JSON export"""
+        with self._lock:
+            nodes = {span["id"]: {**span, "children": []} for span in self.spans}
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node.pop("parent"))
+            del node["id"]
+            (parent["children"] if parent else roots).append(node)
+        return roots
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP flashcardooor_phase_seconds Time spent per automation phase",
+            "# TYPE flashcardooor_phase_seconds summary"
+        ]
+        summary = self.summary()
+        for name, stats in sorted(summary.items()):
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("1", "max")):
+                lines.append(f'flashcardooor_phase_seconds{{phase="{name}",quantile="{quantile}"}} {stats[key]:.6f}')
+            lines.append(f'flashcardooor_phase_seconds_sum{{phase="{name}"}} {stats["total"]:.6f}')
+            lines.append(f'flashcardooor_phase_seconds_count{{phase="{name}"}} {stats["count"]}')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE flashcardooor_{name} gauge")
+            lines.append(f"flashcardooor_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Optional[str] = None):
+        """Write metrics as a Prometheus textfile (.prom) or JSON (anything else)"""
+        path = path or self.export_path
+        if not path:
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            if path.endswith(".prom"):
+                f.write(self.to_prometheus())
+            else:
+                json.dump({
+                    "started_at": self.started_at,
+                    "finished_at": time.time(),
+                    "counters": self.counters,
+                    "phases": self.summary(),
+                    "spans": self.span_tree()
+                }, f, indent=2)
+        os.replace(tmp_path, path)
+        print(f"Metrics written to {path}")
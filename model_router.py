@@ -0,0 +1,158 @@
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from metrics import percentile
+
+# USD per million (input, output) tokens
+MODEL_PRICES = {
+    "claude-3-haiku-20240307": (0.25, 1.25),
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+    "claude-3-7-sonnet-20250219": (3.00, 15.00),
+    "claude-sonnet-4-20250514": (3.00, 15.00),
+    "claude-3-opus-20240229": (15.00, 75.00),
+}
+
+# A fenced block, or an indented / brace-terminated line, means the card quotes real code
+CODE_BLOCK = re.compile(r"```|^( {4}|\t)\S|[{};]\s*$", re.MULTILINE)
+
+
+def question_words(question: str) -> int:
+    return len(question.split())
+
+
+def is_multi_part(question: str) -> bool:
+    return question.count("?") > 1 or bool(re.search(r"^\s*(\d+[.)]|[-*•])\s", question, re.MULTILINE))
+
+
+def call_cost(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """Cost in USD, or None for a model missing from MODEL_PRICES"""
+    prices = MODEL_PRICES.get(model)
+    if not prices:
+        return None
+    return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+
+class Route:
+    """A model and answer token budget for a class of questions"""
+
+    def __init__(self, name: str, model: str, max_tokens: int):
+        self.name = name
+        self.model = model
+        self.max_tokens = max_tokens
+
+
+class RouteStats:
+    def __init__(self):
+        self.calls = 0
+        self.questions = 0
+        self.latencies: List[float] = []
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.truncated = 0
+        self.cost = 0.0
+        self.unpriced = 0
+
+
+class ModelRouter:
+    """Picks the model and max_tokens for each question and accounts latency, tokens and cost per route.
+
+    Routes: "short" for one-liners (at most short_words words, even with inline code), "long" for
+    multi-part questions, quoted code blocks or more than long_words words, and "standard" for the
+    rest. Without short_model every route uses default_model. Once a short-route answer in a deck
+    is cut off at max_tokens, the rest of that deck is routed as standard. The deck is passed with
+    each call, since answers for one deck may still be prefetched while another is open.
+
+    With routing=False every question takes the standard route, so only the accounting applies.
+    Subclass and override route() to plug in other rules.
+    """
+
+    def __init__(
+        self,
+        default_model: str,
+        standard_max_tokens: int = 512,
+        short_model: Optional[str] = None,
+        short_max_tokens: int = 256,
+        long_model: Optional[str] = None,
+        long_max_tokens: int = 1024,
+        short_words: int = 16,
+        long_words: int = 40,
+        routing: bool = True
+    ):
+        self.routes = {
+            "short": Route("short", short_model or default_model, short_max_tokens),
+            "standard": Route("standard", default_model, standard_max_tokens),
+            "long": Route("long", long_model or default_model, long_max_tokens),
+        }
+        self.short_words = short_words
+        self.long_words = long_words
+        self.routing = routing
+        self.escalated_decks = set()
+        # Keyed by route name and the model that actually answered
+        self.stats: Dict[Tuple[str, str], RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def route(self, question: str, deck: Optional[str] = None) -> Route:
+        if not self.routing:
+            return self.routes["standard"]
+        words = question_words(question)
+        if words > self.long_words or is_multi_part(question) or CODE_BLOCK.search(question):
+            return self.routes["long"]
+        if words <= self.short_words and deck not in self.escalated_decks:
+            return self.routes["short"]
+        return self.routes["standard"]
+
+    @property
+    def models(self) -> List[str]:
+        """Every model a route may answer with"""
+        return list(dict.fromkeys(route.model for route in self.routes.values()))
+
+    def route_batch(self, questions: List[str], deck: Optional[str] = None) -> Route:
+        """One route for a batched request: the most demanding route among its questions"""
+        names = {self.route(question, deck).name for question in questions}
+        for name in ("long", "standard", "short"):
+            if name in names:
+                return self.routes[name]
+        return self.routes["standard"]
+
+    def record(self, route: Route, seconds: float, input_tokens: int, output_tokens: int,
+               truncated: bool = False, questions: int = 1, model: Optional[str] = None,
+               deck: Optional[str] = None):
+        """Account one call. model is the one that answered (default: the route's); a truncated
+        short-route answer escalates deck."""
+        model = model or route.model
+        cost = call_cost(model, input_tokens, output_tokens)
+        with self._lock:
+            stats = self.stats.setdefault((route.name, model), RouteStats())
+            stats.calls += 1
+            stats.questions += questions
+            stats.latencies.append(seconds)
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            if cost is None:
+                stats.unpriced += 1
+            else:
+                stats.cost += cost
+            if truncated:
+                stats.truncated += 1
+                if route.name == "short" and deck:
+                    self.escalated_decks.add(deck)
+
+    @property
+    def total_cost(self) -> float:
+        return sum(stats.cost for stats in self.stats.values())
+
+    def print_stats(self):
+        if not self.stats:
+            return
+        print(f"\n{'route':<10}{'model':<28}{'calls':>6}{'cards':>6}{'p50':>7}{'p95':>7}{'max':>7}"
+              f"{'in tok':>9}{'out tok':>9}{'cut':>5}{'cost $':>9}")
+        for (name, model), stats in self.stats.items():
+            latencies = sorted(stats.latencies)
+            cost = f"{stats.cost:.4f}" + ("*" if stats.unpriced else "")
+            print(f"{name:<10}{model[:27]:<28}{stats.calls:>6}{stats.questions:>6}"
+                  f"{percentile(latencies, 0.5):>6.2f}s{percentile(latencies, 0.95):>6.2f}s{latencies[-1]:>6.2f}s"
+                  f"{stats.input_tokens:>9}{stats.output_tokens:>9}{stats.truncated:>5}{cost:>9}")
+        print(f"Total Claude cost: ${self.total_cost:.4f}"
+              + (" (* some calls used a model without a known price)" if any(s.unpriced for s in self.stats.values()) else ""))
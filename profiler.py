@@ -0,0 +1,159 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# WebDriver calls are attributed to the first method of these modules up the stack...
+SITE_MODULES = {"automation.py"}
+# ...that is not one of these thin wrappers
+PASS_THROUGH = {"_execute_script", "_execute_async_script", "_call_helper", "_click", "wrapper", "wait_for",
+                "wait_and_click"}
+
+# Commands whose response size is worth recording
+PAYLOAD_COMMANDS = {"getPageSource", "w3cExecuteScript", "w3cExecuteScriptAsync", "screenshot", "elementScreenshot"}
+
+
+def call_site(frame) -> str:
+    while frame:
+        code = frame.f_code
+        if os.path.basename(code.co_filename) in SITE_MODULES and code.co_name not in PASS_THROUGH:
+            return code.co_name
+        frame = frame.f_back
+    return "(outside automation)"
+
+
+class CommandStats:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.payload_bytes = 0
+
+
+class WebDriverProfiler:
+    """Counts and times every WebDriver command by command type and by the FlashcardAutomation
+    method that issued it, with response sizes for page source, scripts and screenshots"""
+
+    def __init__(self):
+        self.stats: Dict[Tuple[str, str], CommandStats] = {}
+        self._lock = threading.Lock()
+
+    def attach_driver(self, driver):
+        if not isinstance(driver.command_executor, ProfilingExecutor):
+            driver.command_executor = ProfilingExecutor(driver.command_executor, self)
+
+    def record(self, site: str, command: str, seconds: float, payload_bytes: int):
+        with self._lock:
+            stats = self.stats.setdefault((site, command), CommandStats())
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.payload_bytes += payload_bytes
+
+    def format_table(self) -> str:
+        rows = sorted(self.stats.items(), key=lambda item: -item[1].seconds)
+        total_calls = sum(stats.calls for stats in self.stats.values())
+        total_seconds = sum(stats.seconds for stats in self.stats.values())
+        lines = [
+            f"WebDriver commands: {total_calls} calls, {total_seconds:.1f}s",
+            f"{'call site':<32}{'command':<26}{'calls':>7}{'total s':>9}{'share':>7}{'mean ms':>9}{'max ms':>9}{'KiB':>9}",
+        ]
+        for (site, command), stats in rows:
+            lines.append(
+                f"{site[:31]:<32}{command[:25]:<26}{stats.calls:>7}{stats.seconds:>9.2f}"
+                f"{stats.seconds / total_seconds * 100 if total_seconds else 0:>6.1f}%"
+                f"{stats.seconds / stats.calls * 1000:>9.1f}{stats.max_seconds * 1000:>9.1f}"
+                f"{stats.payload_bytes / 1024:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+class ProfilingExecutor:
+    """Stands in for the driver's command executor, timing each command for WebDriverProfiler"""
+
+    def __init__(self, executor, profiler: WebDriverProfiler):
+        self._executor = executor
+        self._profiler = profiler
+
+    def execute(self, command: str, params: Dict) -> Dict:
+        start = time.perf_counter()
+        response = self._executor.execute(command, params)
+        seconds = time.perf_counter() - start
+        payload = 0
+        if command in PAYLOAD_COMMANDS and response:
+            value = response.get("value")
+            payload = len(value) if isinstance(value, str) else len(json.dumps(value, default=str))
+        self._profiler.record(call_site(sys._getframe(1)), command, seconds, payload)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._executor, name)
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval, for collapsed-stack flame graphs"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame:
+                stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RunProfiler:
+    """--profile: WebDriver accounting plus cProfile and sampled stacks of the calling thread, written as
+    <prefix>-webdriver.txt, <prefix>.prof (pstats / snakeviz) and <prefix>.collapsed (flamegraph.pl / speedscope)"""
+
+    def __init__(self, prefix: str = "profile"):
+        self.prefix = prefix
+        self.webdriver = WebDriverProfiler()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+
+    def start(self):
+        self._sampler = StackSampler(threading.get_ident())
+        self._sampler.start()
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+
+    def stop(self):
+        if not self._cprofile:
+            return
+        self._cprofile.disable()
+        self._sampler.stop()
+
+        table = self.webdriver.format_table()
+        print(f"\n{table}")
+        with open(f"{self.prefix}-webdriver.txt", "w") as f:
+            f.write(table + "\n")
+        self._cprofile.dump_stats(f"{self.prefix}.prof")
+        self._sampler.write_collapsed(f"{self.prefix}.collapsed")
+        print(f"Profile written to {self.prefix}-webdriver.txt, {self.prefix}.prof and {self.prefix}.collapsed")
+        self._cprofile = None
@@ -0,0 +1,77 @@
+import re
+from typing import Optional, Tuple
+
+
+def parse_progress(stats_text: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse (completed, total) out of the deck stats message, or None if it is not recognised"""
+    if not stats_text:
+        return None
+
+    # Format: "You have mastered all X cards in this deck!"
+    match = re.search(r"have mastered all (\d+)", stats_text)
+    if match:
+        total = int(match.group(1))
+        return (total, total)
+
+    # Format: "You still need to master all X cards in this deck"
+    match = re.search(r"still need to master all (\d+)", stats_text)
+    if match:
+        return (0, int(match.group(1)))
+
+    # Format: "You have mastered X out of Y cards in this deck"
+    match = re.search(r"mastered (\d+) out of (\d+)", stats_text)
+    if match:
+        return (int(match.group(1)), int(match.group(2)))
+
+    return None
+
+
+class ProgressTracker:
+    """Deck progress kept locally instead of re-reading the stats message before every card.
+
+    The count advances on each successful "I knew it" click. It is corrected from the stats text
+    the page helper already returns with each card state whenever that text changes, and callers
+    re-verify it against the page every verify_every cards.
+    """
+
+    def __init__(self, completed: int, total: int, stats_text: Optional[str] = None, verify_every: int = 10):
+        self.completed = completed
+        self.total = total
+        self.stats_text = stats_text
+        self.verify_every = verify_every
+        self.cards_since_verify = 0
+        self.corrections = 0
+
+    @property
+    def is_complete(self) -> bool:
+        return self.total > 0 and self.completed >= self.total
+
+    def advance(self):
+        """Count one mastered card"""
+        self.completed = min(self.total, self.completed + 1)
+        self.cards_since_verify += 1
+
+    def observe(self, stats_text: Optional[str]) -> bool:
+        """Take the page's count when its stats message has changed. Returns True if it was used.
+
+        A count behind ours is usually the message lagging the last click, so it is left for the
+        next full verification rather than applied.
+        """
+        if not stats_text or stats_text == self.stats_text:
+            return False
+        self.stats_text = stats_text
+        progress = parse_progress(stats_text)
+        if not progress or (progress[1] == self.total and progress[0] < self.completed):
+            return False
+        self.verified(*progress)
+        return True
+
+    def needs_verification(self) -> bool:
+        return bool(self.verify_every) and self.cards_since_verify >= self.verify_every
+
+    def verified(self, completed: int, total: int):
+        """Replace the local count with one read from the page"""
+        if total and (completed, total) != (self.completed, self.total):
+            self.corrections += 1
+            self.completed, self.total = completed, total
+        self.cards_since_verify = 0
@@ -0,0 +1,87 @@
+import json
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+
+class RunLedger:
+    """Append-only JSONL log of per-deck checkpoints, used to resume interrupted runs"""
+
+    def __init__(self, path: str = "run-ledger.jsonl"):
+        self.path = path
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        # Opened on the first record, so reading the ledger (e.g. for `stats`) never creates it
+        self._file = None
+
+    def _open(self):
+        self._file = open(self.path, "a", buffering=1)
+
+        # A crash can leave a half-written last line; start on a fresh one so it stays isolated
+        if self._file.tell() > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def record(self, deck_url: str, event: str, completed: int = 0, total: int = 0, outcome: Optional[str] = None):
+        """Append one checkpoint; event is 'start', 'card' or 'finish'"""
+        entry = {
+            "ts": time.time(),
+            "run_id": self.run_id,
+            "deck_url": deck_url,
+            "event": event,
+            "completed": completed,
+            "total": total
+        }
+        if outcome:
+            entry["outcome"] = outcome
+        if self._file is None:
+            self._open()
+        self._file.write(json.dumps(entry) + "\n")
+
+    def entries(self) -> List[Dict]:
+        """Every readable entry in order; a line cut short by a crash is ignored"""
+        entries = []
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return entries
+
+    def latest_by_deck(self) -> Dict[str, Dict]:
+        """The most recent entry for each deck URL"""
+        latest = {}
+        for entry in self.entries():
+            latest[entry["deck_url"]] = entry
+        return latest
+
+    def completed_decks(self) -> Set[str]:
+        """Decks whose latest checkpoint shows every card mastered"""
+        return {
+            url for url, entry in self.latest_by_deck().items()
+            if entry.get("outcome") == "complete" or (entry["total"] and entry["completed"] >= entry["total"])
+        }
+
+    def interrupted_deck(self) -> Optional[str]:
+        """The deck that was still in progress when the last run stopped, if any"""
+        entries = self.entries()
+        if not entries:
+            return None
+        last = entries[-1]
+        return None if last["event"] == "finish" else last["deck_url"]
+
+    def resume_order(self, decks: List[Dict]) -> List[Dict]:
+        """Drop decks the ledger marks complete and move the interrupted deck to the front"""
+        completed = self.completed_decks()
+        interrupted = self.interrupted_deck()
+        decks = [deck for deck in decks if deck["url"] not in completed]
+        decks.sort(key=lambda deck: deck["url"] != interrupted)
+        return decks
+
+    def close(self):
+        if self._file:
+            self._file.close()
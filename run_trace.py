@@ -0,0 +1,398 @@
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from http_crawler import HttpCrawlError
+
+TRACE_VERSION = 1
+
+# Screenshots are large and never inspected by the control flow, so only their size is kept
+ELIDED_COMMANDS = {Command.SCREENSHOT, Command.ELEMENT_SCREENSHOT}
+
+# Parameters that carry answer text rather than control flow; ignored when matching commands on replay
+VOLATILE_PARAMS = {"sessionId", "args", "text", "value"}
+
+# Answer given on replay to a question the trace has no answer for
+MISSING_ANSWER = "(no answer recorded in the trace)"
+
+# Page helper calls whose number depends on wall-clock time (fills while an answer streams in).
+# On replay one with no recorded match is answered as a successful call instead of diverging.
+TIMING_DEPENDENT_CALLS = ("window.__flashcardooor.fill(",)
+
+
+def command_key(command: str, params: Optional[Dict]) -> str:
+    """What identifies a WebDriver command on replay: its name, target and script, not its answer text"""
+    params = params or {}
+    volatile = VOLATILE_PARAMS if command == Command.SEND_KEYS_TO_ELEMENT else VOLATILE_PARAMS - {"value", "text"}
+    return json.dumps([command, {k: v for k, v in params.items() if k not in volatile}], sort_keys=True, default=str)
+
+
+def request_key(request: Dict) -> str:
+    """LLM requests match on their prompt, so a replay still works after a model change"""
+    return json.dumps({k: request.get(k) for k in ("system", "messages")}, sort_keys=True, default=str)
+
+
+def read_trace(path: str) -> Tuple[Dict, List[Dict]]:
+    """Header and events of a trace, tolerating a file cut short by a crashed run"""
+    header: Dict = {}
+    events: List[Dict] = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record.get("kind") == "header":
+                    header = record
+                else:
+                    events.append(record)
+    except (EOFError, ValueError) as e:
+        print(f"Trace {path} is truncated ({str(e) or type(e).__name__}) - using the {len(events)} events before it")
+    return header, events
+
+
+def summarize(events: List[Dict]) -> Dict[str, Dict[str, float]]:
+    """Per-deck totals of WebDriver round trips, sleeps, API calls and HTTP requests"""
+    decks: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for event in events:
+        deck = decks[event.get("deck") or "(setup)"]
+        kind = event["kind"]
+        if kind == "webdriver":
+            deck["round_trips"] += 1
+            deck["webdriver_seconds"] += event["seconds"]
+        elif kind == "sleep":
+            deck["sleeps"] += 1
+            deck["sleep_seconds"] += event["seconds"]
+        elif kind == "llm":
+            deck["llm_calls"] += 1
+            deck["llm_seconds"] += event["seconds"]
+        elif kind == "http":
+            deck["http_requests"] += 1
+        elif kind == "deck":
+            deck["seconds"] += event["seconds"]
+    return decks
+
+
+SUMMARY_COLUMNS = ("round_trips", "sleeps", "sleep_seconds", "llm_calls", "http_requests", "seconds")
+
+
+def print_summary(events: List[Dict]):
+    decks = summarize(events)
+    print(f"{'deck':<60} " + " ".join(f"{column:>13}" for column in SUMMARY_COLUMNS))
+    for deck, totals in decks.items():
+        print(f"{deck[-60:]:<60} " + " ".join(f"{totals[column]:>13.1f}" for column in SUMMARY_COLUMNS))
+
+
+def compare_traces(before_path: str, after_path: str):
+    """Print how round trips, sleeps and API calls per deck changed between two traces"""
+    before = summarize(read_trace(before_path)[1])
+    after = summarize(read_trace(after_path)[1])
+    totals = {"before": defaultdict(float), "after": defaultdict(float)}
+
+    print(f"{'deck':<50} " + " ".join(f"{column:>22}" for column in SUMMARY_COLUMNS))
+    for deck in list(before) + [deck for deck in after if deck not in before]:
+        cells = []
+        for column in SUMMARY_COLUMNS:
+            old, new = before.get(deck, {}).get(column, 0), after.get(deck, {}).get(column, 0)
+            totals["before"][column] += old
+            totals["after"][column] += new
+            cells.append(f"{old:>8.1f} → {new:>8.1f}".rjust(22))
+        print(f"{deck[-50:]:<50} " + " ".join(cells))
+
+    print(f"{'total':<50} " + " ".join(
+        f"{totals['before'][column]:>8.1f} → {totals['after'][column]:>8.1f}".rjust(22) for column in SUMMARY_COLUMNS
+    ))
+
+
+class TraceRecorder:
+    """Appends every WebDriver command, LLM request, HTTP fetch and sleep of a run to a gzipped
+    JSON-lines trace, tagged with the deck being processed.
+
+    With realtime=False (used when replaying) sleeps are recorded but not slept.
+    """
+
+    def __init__(self, path: Optional[str], header: Optional[Dict] = None, realtime: bool = True):
+        self.path = path
+        self.realtime = realtime
+        self.deck: Optional[str] = None
+        self.events: List[Dict] = []
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "wt", encoding="utf-8") if path else None
+        self._write({"kind": "header", "version": TRACE_VERSION, "recorded_at": time.time(), **(header or {})})
+
+    def _write(self, event: Dict):
+        with self._lock:
+            if event["kind"] != "header":
+                self.events.append(event)
+            if self._file:
+                self._file.write(json.dumps(event, default=str) + "\n")
+
+    def record(self, kind: str, **fields):
+        self._write({"kind": kind, "deck": self.deck, **fields})
+
+    @contextmanager
+    def deck_scope(self, url: str):
+        self.deck = url
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record("deck", url=url, seconds=time.perf_counter() - start)
+            self.deck = None
+
+    def sleep(self, seconds: float):
+        self.record("sleep", seconds=seconds)
+        if self.realtime:
+            time.sleep(seconds)
+
+    def attach_driver(self, driver):
+        if not isinstance(driver.command_executor, RecordingExecutor):
+            driver.command_executor = RecordingExecutor(driver.command_executor, self)
+
+    def attach_llm(self, llm_client):
+        if not isinstance(llm_client.client, RecordingAnthropic):
+            llm_client.client = RecordingAnthropic(llm_client.client, self)
+
+    def attach_http(self, crawler):
+        fetch = crawler.fetch
+
+        def recording_fetch(url: str) -> str:
+            start = time.perf_counter()
+            try:
+                text = fetch(url)
+            except HttpCrawlError as e:
+                self.record("http", url=url, error=str(e), seconds=time.perf_counter() - start)
+                raise
+            self.record("http", url=url, text=text, seconds=time.perf_counter() - start)
+            return text
+
+        crawler.fetch = recording_fetch
+
+    def print_stats(self):
+        if self.path:
+            print(f"Trace: {len(self.events)} events written to {self.path}")
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class RecordingExecutor:
+    """Stands in for the driver's command executor, recording each command and its response"""
+
+    def __init__(self, executor, trace: TraceRecorder):
+        self._executor = executor
+        self._trace = trace
+
+    def execute(self, command: str, params: Dict) -> Dict:
+        start = time.perf_counter()
+        response = self._executor.execute(command, params)
+        recorded = response
+        if command in ELIDED_COMMANDS and response:
+            recorded = {**response, "value": "", "elided_bytes": len(response.get("value") or "")}
+        # Serialized now: the driver unwraps response["value"] in place once this returns
+        self._trace.record(
+            "webdriver",
+            command=command,
+            params=json.loads(json.dumps(params or {}, default=str)),
+            response=json.loads(json.dumps(recorded, default=str)),
+            seconds=time.perf_counter() - start
+        )
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._executor, name)
+
+
+def _response_text(response) -> str:
+    return "".join(getattr(block, "text", "") for block in getattr(response, "content", []))
+
+
+class RecordingAnthropic:
+    """Wraps the async Anthropic client so each messages.create / messages.stream call is recorded"""
+
+    def __init__(self, client, trace: TraceRecorder):
+        self._client = client
+        self._trace = trace
+        self.messages = SimpleNamespace(create=self._create, stream=self._stream)
+
+    async def _create(self, **request):
+        start = time.perf_counter()
+        response = await self._client.messages.create(**request)
+        usage = getattr(response, "usage", None)
+        self._trace.record(
+            "llm",
+            request=request,
+            text=_response_text(response),
+            usage={"input_tokens": usage.input_tokens, "output_tokens": usage.output_tokens} if usage else None,
+            seconds=time.perf_counter() - start
+        )
+        return response
+
+    def _stream(self, **request):
+        return _RecordingStream(self._client.messages.stream(**request), self._trace, request)
+
+    async def close(self):
+        if hasattr(self._client, "close"):
+            await self._client.close()
+
+
+class _RecordingStream:
+    def __init__(self, manager, trace: TraceRecorder, request: Dict):
+        self._manager = manager
+        self._trace = trace
+        self._request = request
+        self._chunks: List[str] = []
+
+    async def __aenter__(self):
+        self._start = time.perf_counter()
+        self._stream = await self._manager.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._trace.record(
+            "llm", request=self._request, text="".join(self._chunks), usage=None, stream=True,
+            seconds=time.perf_counter() - self._start
+        )
+        return await self._manager.__aexit__(*exc_info)
+
+    @property
+    async def text_stream(self):
+        async for text in self._stream.text_stream:
+            self._chunks.append(text)
+            yield text
+
+
+class TraceDivergence(WebDriverException):
+    """The replayed code issued a WebDriver command the trace has no response for"""
+
+
+class TraceReplay:
+    """Serves a recorded trace back to a run: WebDriver responses in order, LLM answers by prompt
+    and HTTP pages by URL, with no browser and no network.
+
+    Each command is matched against the next recorded commands (up to lookahead ahead), so code
+    that drops a few round trips still replays; commands with no match raise TraceDivergence,
+    except streamed answer fills, whose number depends on timing.
+    """
+
+    def __init__(self, path: str, lookahead: int = 50):
+        self.header, events = read_trace(path)
+        self.lookahead = lookahead
+        self.webdriver = [event for event in events if event["kind"] == "webdriver"]
+        self.cursor = 0
+        # Commands can come from more than one thread (e.g. answer prefetching next to the deck loop)
+        self._lock = threading.Lock()
+        self.llm = {request_key(event["request"]): event for event in events if event["kind"] == "llm"}
+        self.http = {event["url"]: event for event in events if event["kind"] == "http"}
+        # Answers the recorded run took from its cache or fuzzy index, to seed the replay's cache with
+        self.cached_answers: Dict[str, str] = {
+            event["question"]: event["answer"] for event in events if event["kind"] == "answer"
+        }
+        self.answers = dict(self.cached_answers)
+        for event in self.llm.values():
+            if not event["request"].get("system"):
+                self.answers.setdefault(event["request"]["messages"][-1]["content"], event["text"])
+        self.matched = 0
+        self.skipped = 0
+        self.diverged = 0
+        self.unmatched_fills = 0
+        self.llm_misses = 0
+
+    def next_response(self, command: str, params: Dict) -> Dict:
+        key = command_key(command, params)
+        with self._lock:
+            window = self.webdriver[self.cursor:self.cursor + self.lookahead]
+            for offset, event in enumerate(window):
+                if command_key(event["command"], event["params"]) == key:
+                    self.skipped += offset
+                    self.cursor += offset + 1
+                    self.matched += 1
+                    return json.loads(json.dumps(event["response"]))
+            if any(call in str((params or {}).get("script", "")) for call in TIMING_DEPENDENT_CALLS):
+                self.unmatched_fills += 1
+                return {"value": [True]}
+            self.diverged += 1
+            raise TraceDivergence(f"no recorded response for {command} near trace position {self.cursor}")
+
+    def driver(self) -> webdriver.Remote:
+        return webdriver.Remote(command_executor=ReplayExecutor(self), options=webdriver.ChromeOptions())
+
+    def anthropic(self) -> "ReplayAnthropic":
+        return ReplayAnthropic(self)
+
+    def attach_http(self, crawler):
+        def replay_fetch(url: str) -> str:
+            event = self.http.get(url)
+            if not event or "error" in event:
+                raise HttpCrawlError(event["error"] if event else f"{url} is not in the trace")
+            return event["text"]
+
+        crawler.fetch = replay_fetch
+
+    def print_stats(self):
+        print(f"Replay: {self.matched} of {len(self.webdriver)} recorded WebDriver commands replayed, "
+              f"{self.skipped} skipped, {self.diverged} divergences, {self.unmatched_fills} extra streamed fills, "
+              f"{self.llm_misses} unrecorded LLM requests")
+
+
+class ReplayExecutor:
+    def __init__(self, replay: TraceReplay):
+        self._replay = replay
+
+    def execute(self, command: str, params: Dict) -> Dict:
+        if command == Command.NEW_SESSION:
+            return {"value": {"sessionId": "replay", "capabilities": {"browserName": "chrome"}}}
+        if command == Command.QUIT:
+            return {"value": None}
+        return self._replay.next_response(command, params)
+
+    def close(self):
+        pass
+
+
+class ReplayAnthropic:
+    def __init__(self, replay: TraceReplay):
+        self._replay = replay
+        self.messages = SimpleNamespace(create=self._create, stream=self._stream)
+
+    def _lookup(self, request: Dict) -> str:
+        event = self._replay.llm.get(request_key(request))
+        if event:
+            return event["text"]
+        self._replay.llm_misses += 1
+        if request.get("system"):
+            # A batch grouped differently than when recorded: let the client fall back to single questions
+            raise ValueError("batched request is not in the trace")
+        return self._replay.answers.get(request["messages"][-1]["content"], MISSING_ANSWER)
+
+    async def _create(self, **request):
+        text = self._lookup(request)
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], usage=None)
+
+    def _stream(self, **request):
+        return _ReplayStream(self._lookup(request))
+
+
+class _ReplayStream:
+    def __init__(self, text: str):
+        self._text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        yield self._text
@@ -0,0 +1,83 @@
+import pytest
+
+import answer_cache
+from answer_cache import AnswerCache, normalize_question
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache.time, "time", clock)
+    return clock
+
+
+def test_normalize_question_collapses_whitespace_and_case():
+    assert normalize_question("  What IS\n a   list? ") == "what is a list?"
+
+
+def test_get_matches_normalized_question_and_model(clock):
+    cache = AnswerCache(path=":memory:")
+    cache.put("What is a list?", "model-a", "An ordered sequence")
+
+    assert cache.get("what is  a LIST?", "model-a") == "An ordered sequence"
+    assert cache.get("What is a list?", "model-b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_put_replaces_existing_answer(clock):
+    cache = AnswerCache(path=":memory:")
+    cache.put("q", "m", "old")
+    cache.put("q", "m", "new")
+
+    assert cache.get("q", "m") == "new"
+    assert len(cache) == 1
+
+
+def test_eviction_drops_least_recently_used(clock):
+    cache = AnswerCache(path=":memory:", max_entries=2)
+    cache.put("first", "m", "1")
+    clock.now += 1
+    cache.put("second", "m", "2")
+    clock.now += 1
+    # Reading "first" makes "second" the least recently used entry
+    assert cache.get("first", "m") == "1"
+    clock.now += 1
+    cache.put("third", "m", "3")
+
+    assert len(cache) == 2
+    assert cache.get("second", "m") is None
+    assert cache.get("first", "m") == "1"
+    assert cache.get("third", "m") == "3"
+
+
+def test_expired_entries_are_missed_and_pruned(clock):
+    cache = AnswerCache(path=":memory:", ttl_seconds=60)
+    cache.put("old", "m", "1")
+    clock.now += 30
+    cache.put("fresh", "m", "2")
+    clock.now += 40
+
+    assert cache.get("old", "m") is None
+    assert cache.entries("m") == [("fresh", "2")]
+    clock.now += 60
+    assert cache.prune() == 1
+    assert len(cache) == 0
+
+
+def test_prune_enforces_max_entries(clock):
+    cache = AnswerCache(path=":memory:", max_entries=5)
+    for i in range(5):
+        clock.now += 1
+        cache.put(f"q{i}", "m", str(i))
+    cache.max_entries = 3
+
+    assert cache.prune() == 2
+    assert [question for question, _ in cache.entries("m")] == ["q2", "q3", "q4"]
@@ -0,0 +1,42 @@
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from answer_pipeline import AnswerPipeline
+
+
+def test_prefetch_sends_questions_in_batches():
+    batches = []
+
+    def answer_batch(questions, deck):
+        batches.append((list(questions), deck))
+        return {question: question.upper() for question in questions}
+
+    pipeline = AnswerPipeline(lambda question, deck: None, batch_fn=answer_batch, batch_size=2)
+    pipeline.prefetch(["a", "b", "c"], deck="deck-1")
+
+    assert [pipeline.result(question) for question in ("a", "b", "c")] == ["A", "B", "C"]
+    assert sorted(batches) == [(["a", "b"], "deck-1"), (["c"], "deck-1")]
+    pipeline.shutdown()
+
+
+def test_shutdown_cancels_queued_batch_futures():
+    release = threading.Event()
+    asked = []
+
+    def answer_batch(questions, deck):
+        asked.extend(questions)
+        release.wait(5)
+        return {question: "answer" for question in questions}
+
+    pipeline = AnswerPipeline(lambda question, deck: None, max_workers=1, batch_fn=answer_batch, batch_size=2)
+    # The first batch occupies the only worker, so the second one is still queued
+    pipeline.prefetch(["a", "b", "c", "d"])
+    queued = pipeline.submit("c")
+    pipeline.shutdown()
+    release.set()
+
+    with pytest.raises(CancelledError):
+        queued.result(timeout=1)
+    assert "c" not in asked
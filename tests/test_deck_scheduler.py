@@ -0,0 +1,88 @@
+import pytest
+
+import deck_scheduler
+from deck_scheduler import DeckScheduler, parse_duration
+
+# Estimates with 1s per card and 5s per deck: a 7s, b 25s, c (unopened, average total 15) 20s
+DECKS = [
+    {"name": "a", "completed": 8, "total": 10},
+    {"name": "b", "completed": 0, "total": 20},
+    {"name": "c"},
+]
+
+
+def names(decks):
+    return [deck["name"] for deck in decks]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(deck_scheduler.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize("text, seconds", [
+    ("45", 2700),
+    ("30m", 1800),
+    ("1h30m", 5400),
+    ("90s", 90),
+    (" 1.5H ", 5400),
+    ("1h 2m 3s", 3723),
+])
+def test_parse_duration(text, seconds):
+    assert parse_duration(text) == seconds
+
+
+@pytest.mark.parametrize("text", ["", "soon", "30x", "h", "-5m"])
+def test_parse_duration_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_duration(text)
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        DeckScheduler(policy="random")
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("page", ["a", "b", "c"]),
+    ("fewest-remaining", ["a", "c", "b"]),
+    ("most-remaining", ["b", "c", "a"]),
+])
+def test_order(policy, expected):
+    assert names(DeckScheduler(policy=policy).order(DECKS)) == expected
+
+
+def test_plan_skips_decks_that_do_not_fit_the_budget():
+    scheduler = DeckScheduler(seconds_per_card=1, seconds_per_deck=5)
+    decks = scheduler.order(DECKS)
+
+    assert names(scheduler.plan(decks)) == ["a", "b", "c"]
+    # a leaves 23s, b (25s) no longer fits but c (20s) does, and 3s cannot finish a card of b
+    assert names(scheduler.plan(decks, remaining=30)) == ["a", "c"]
+
+
+def test_schedule_follows_the_time_actually_left(clock):
+    scheduler = DeckScheduler(time_budget=30, seconds_per_card=1, seconds_per_deck=5)
+    scheduler.start_clock()
+    decks = scheduler.order(DECKS)
+    scheduled = scheduler.schedule(decks)
+
+    assert next(scheduled)["name"] == "a"
+    clock[0] = 20
+    # Nothing fits in the 10s left, but a card can still be done, so the next deck starts anyway
+    assert next(scheduled)["name"] == "b"
+    clock[0] = 30
+    assert scheduler.expired()
+    assert list(scheduled) == []
+    assert names(scheduler.left) == ["c"]
+
+
+def test_record_deck_replaces_the_per_card_estimate():
+    scheduler = DeckScheduler(seconds_per_card=6)
+
+    scheduler.record_deck(4, 10.0)
+    scheduler.record_deck(0, 0.0)
+
+    assert scheduler.seconds_per_card == 2.5
@@ -0,0 +1,51 @@
+from fuzzy_index import FuzzyQuestionIndex, question_terms
+
+QUESTIONS = [
+    "What is returned by groupby in pandas?",
+    "How do you read a CSV file in pandas?",
+    "What does `ls` do?",
+    "What is `a + b`?",
+]
+
+
+def make_index(**kwargs):
+    index = FuzzyQuestionIndex(**kwargs)
+    for question in QUESTIONS:
+        index.add(question, f"answer to {question}")
+    return index
+
+
+def test_question_terms_keep_code_names_and_resolve_aliases():
+    assert question_terms("What does `df.groupby` return?") == {"panda", "groupby", "return"}
+    assert question_terms("What does `ls -a` do?") == {"`ls-a`", "ls", "-a"}
+
+
+def test_rewording_matches_at_default_threshold():
+    index = make_index()
+
+    question, answer, score = index.match("What does `df.groupby` return?")
+
+    assert question == "What is returned by groupby in pandas?"
+    assert answer == "answer to What is returned by groupby in pandas?"
+    assert score >= index.threshold
+    assert index.hits == 1
+
+
+def test_exact_question_matches_regardless_of_case_and_spacing():
+    assert make_index().match("  what is `a + b`?")[2] == 1.0
+
+
+def test_near_misses_do_not_match():
+    index = make_index()
+
+    # Same library and verb, different method
+    assert index.match("What does `df.merge` return?") is None
+    # Code differs only by a flag or an operator
+    assert index.match("What does `ls -a` do?") is None
+    assert index.match("What is `a * b`?") is None
+    assert index.misses == 3
+
+
+def test_empty_index_and_questions_without_terms():
+    assert FuzzyQuestionIndex().match("What does `df.groupby` return?") is None
+    assert make_index().match("What is it?") is None
@@ -0,0 +1,48 @@
+from llm_client import apply_answer_budget, parse_batch_answers
+
+
+def test_parse_batch_answers_maps_ids_to_positions():
+    text = '[{"id": 2, "answer": " second "}, {"id": 1, "answer": "first"}]'
+
+    assert parse_batch_answers(text, 3) == ["first", "second", None]
+
+
+def test_parse_batch_answers_ignores_text_around_the_array():
+    text = 'Here you go:\n[{"id": 1, "answer": "Use [start:stop] slices"}]\nSee [the docs] for more.'
+
+    assert parse_batch_answers(text, 1) == ["Use [start:stop] slices"]
+
+
+def test_parse_batch_answers_drops_unusable_entries():
+    text = '[{"id": 0, "answer": "x"}, {"id": 4, "answer": "x"}, {"id": "1", "answer": "x"}, ' \
+           '{"id": 2, "answer": "  "}, "junk", {"id": 3, "answer": "ok"}]'
+
+    assert parse_batch_answers(text, 3) == [None, None, "ok"]
+
+
+def test_parse_batch_answers_without_json():
+    assert parse_batch_answers("Sorry, I can't answer that.", 2) == [None, None]
+    assert parse_batch_answers('[{"id": 1, "answer": "cut off', 1) == [None]
+    assert parse_batch_answers('{"id": 1, "answer": "x"}', 1) == [None]
+
+
+def test_answer_budget_stops_after_max_sentences():
+    assert apply_answer_budget("One. Two! Three? Four.", max_sentences=2) == ("One. Two!", True)
+    assert apply_answer_budget("One. Two", max_sentences=2) == ("One. Two", False)
+
+
+def test_answer_budget_waits_for_whitespace_while_streaming():
+    # The chunk may continue with "12", so the version number is not a sentence end yet
+    assert apply_answer_budget("Use Python 3.", max_sentences=1) == ("Use Python 3.", False)
+    assert apply_answer_budget("Use Python 3.12 today. More", max_sentences=1) == ("Use Python 3.12 today.", True)
+    assert apply_answer_budget("Use Python 3.", max_sentences=1, final=True) == ("Use Python 3.", True)
+
+
+def test_answer_budget_cuts_on_a_boundary_within_max_chars():
+    text = "First sentence here. Second sentence is much longer than the budget allows"
+
+    assert apply_answer_budget(text, max_chars=30) == ("First sentence here.", True)
+    # A sentence end in the first half of the budget would waste it, so the last word boundary wins
+    assert apply_answer_budget(text, max_chars=50) == ("First sentence here. Second sentence is much", True)
+    assert apply_answer_budget("word " * 20, max_chars=23) == ("word word word word", True)
+    assert apply_answer_budget("short", max_chars=40) == ("short", False)
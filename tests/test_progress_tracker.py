@@ -0,0 +1,56 @@
+import pytest
+
+from progress_tracker import ProgressTracker, parse_progress
+
+
+@pytest.mark.parametrize("stats_text, expected", [
+    ("You have mastered all 25 cards in this deck!", (25, 25)),
+    ("You still need to master all 12 cards in this deck", (0, 12)),
+    ("You have mastered 7 out of 30 cards in this deck", (7, 30)),
+    ("Keep going!", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_progress(stats_text, expected):
+    assert parse_progress(stats_text) == expected
+
+
+def test_advance_stops_at_total():
+    tracker = ProgressTracker(2, 3)
+
+    tracker.advance()
+    tracker.advance()
+
+    assert tracker.completed == 3
+    assert tracker.is_complete
+    assert tracker.cards_since_verify == 2
+
+
+def test_observe_applies_changed_counts_only():
+    tracker = ProgressTracker(5, 30, stats_text="You have mastered 5 out of 30 cards in this deck")
+
+    assert not tracker.observe("You have mastered 5 out of 30 cards in this deck")
+    assert tracker.observe("You have mastered 8 out of 30 cards in this deck")
+    assert (tracker.completed, tracker.total, tracker.corrections) == (8, 30, 1)
+
+
+def test_observe_ignores_a_count_lagging_the_last_click():
+    tracker = ProgressTracker(5, 30)
+    tracker.advance()
+
+    assert not tracker.observe("You have mastered 5 out of 30 cards in this deck")
+    assert tracker.completed == 6
+
+
+def test_needs_verification_every_n_cards():
+    tracker = ProgressTracker(0, 30, verify_every=2)
+    tracker.advance()
+    assert not tracker.needs_verification()
+    tracker.advance()
+    assert tracker.needs_verification()
+
+    tracker.verified(2, 30)
+
+    assert not tracker.needs_verification()
+    assert tracker.corrections == 0
+    assert not ProgressTracker(0, 30, verify_every=0).needs_verification()
@@ -0,0 +1,53 @@
+from run_ledger import RunLedger
+
+
+def decks(*urls):
+    return [{"url": url} for url in urls]
+
+
+def test_resume_order_skips_complete_decks_and_starts_with_the_interrupted_one(tmp_path):
+    ledger = RunLedger(str(tmp_path / "ledger.jsonl"))
+    ledger.record("a", "start", 0, 5)
+    ledger.record("a", "finish", 5, 5, outcome="complete")
+    ledger.record("b", "start", 2, 5)
+    ledger.record("c", "start", 0, 5)
+    ledger.record("c", "card", 1, 5)
+    ledger.close()
+
+    order = RunLedger(ledger.path).resume_order(decks("a", "b", "c", "d"))
+
+    assert [deck["url"] for deck in order] == ["c", "b", "d"]
+
+
+def test_finished_run_has_no_interrupted_deck(tmp_path):
+    ledger = RunLedger(str(tmp_path / "ledger.jsonl"))
+    ledger.record("a", "start", 0, 5)
+    ledger.record("a", "finish", 3, 5, outcome="failed")
+    ledger.close()
+
+    assert ledger.interrupted_deck() is None
+    assert ledger.completed_decks() == set()
+
+
+def test_truncated_last_line_is_ignored_and_isolated(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = RunLedger(str(path))
+    ledger.record("a", "card", 5, 5)
+    ledger.close()
+    with open(path, "a") as f:
+        f.write('{"deck_url": "b", "ev')
+
+    resumed = RunLedger(str(path))
+    resumed.record("c", "start", 0, 3)
+    resumed.close()
+
+    assert [entry["deck_url"] for entry in resumed.entries()] == ["a", "c"]
+    assert resumed.completed_decks() == {"a"}
+    assert resumed.interrupted_deck() == "c"
+
+
+def test_reading_a_missing_ledger_does_not_create_it(tmp_path):
+    ledger = RunLedger(str(tmp_path / "missing.jsonl"))
+
+    assert ledger.resume_order(decks("a")) == decks("a")
+    assert not (tmp_path / "missing.jsonl").exists()